@@ -1,125 +1,582 @@
 import os
 import logging
-from anthropic import Anthropic
-from datetime import datetime
+import asyncio
+import httpx
+from anthropic import Anthropic, AsyncAnthropic, RateLimitError
 import re
+import time
+import sqlite3
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import deque
+from functools import lru_cache
+from datetime import datetime
+
+# Optional semantic cache for near-duplicate articles
+try:
+    import numpy as np
+    from sentence_transformers import SentenceTransformer
+except ImportError:
+    SentenceTransformer = None
+
+# httpx only speaks HTTP/2 when the h2 package is installed
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
-# Initialize Anthropic client
-ANTHROPIC_API_KEY = os.environ.get("ANTHROPIC_API_KEY")
-anthropic_client = Anthropic(api_key=ANTHROPIC_API_KEY) if ANTHROPIC_API_KEY else None
+# Keep-alive pool shared by every request so connections (and TLS sessions) are reused
+HTTP_LIMITS = httpx.Limits(max_keepalive_connections=32, max_connections=64)
+HTTP_TIMEOUT = httpx.Timeout(60.0, connect=5.0)
+
+
+# Analysis settings
+# Articles go to the fast tier (Haiku) first, with the deep tier as fallback.
+# Set DEEP_TIER_MIN_CHARS to send articles at least that long to the deep tier first.
+MODEL_FAST = os.environ.get("ANTHROPIC_MODEL_FAST", "claude-haiku-4-5")
+MODEL_DEEP = os.environ.get("ANTHROPIC_MODEL_DEEP", "claude-3-5-sonnet-20241022")
+DEEP_TIER_MIN_CHARS = int(os.environ.get("DEEP_TIER_MIN_CHARS", "0"))
+MAX_TOKENS = 1500
+FAST_MAX_TOKENS = 800
+
+# Article content sent to Claude is trimmed to about this many tokens
+# (estimated at ~4 characters per token; only a budget, so no tokenizer is loaded)
+MAX_INPUT_TOKENS = int(os.environ.get("MAX_INPUT_TOKENS", "2000"))
+TEMPERATURE = 0.3
+
+# Rows per bulk UPDATE when saving analysis results (all chunks share one commit)
+UPDATE_CHUNK_SIZE = 50
+
+# Unprocessed articles are selected, analyzed and saved this many at a time,
+# so memory stays flat however large the backlog is
+ANALYSIS_PAGE_SIZE = int(os.environ.get("ANALYSIS_PAGE_SIZE", "200"))
+
+# process_new_articles uses the Message Batches API unless disabled, in which
+# case articles are analyzed immediately with concurrent requests
+USE_BATCH_API = os.environ.get("USE_BATCH_API", "true").lower() == "true"
+
+# Batches are never waited on: each is saved as a PendingBatch and the
+# scheduler's drain job collects it once it has ended
+BATCH_MAX_REQUESTS = 10000  # Message Batches API limit per batch
+
+# Without the Batches API, short articles are packed several to a prompt to
+# save round-trips; longer articles are still analyzed one per request.
+# Groups are filled by token count (stored on ingest) up to BULK_GROUP_TOKENS.
+BULK_BATCH_SIZE = int(os.environ.get("BULK_BATCH_SIZE", "8"))
+BULK_MAX_TOKENS = 1500
+BULK_GROUP_TOKENS = int(os.environ.get("BULK_GROUP_TOKENS", "8000"))
+
+# Articles shorter than this (bare RSS excerpts) are summarized locally instead
+# of by Claude; kept low because a short advisory can still describe an actively
+# exploited CVE. Set to 0 to send everything to the API.
+SHORT_ARTICLE_CHARS = int(os.environ.get("SHORT_ARTICLE_CHARS", "300"))
+SHORT_ARTICLE_MAX_POINTS = 5
+
+# Concurrent analysis limits (defaults match the entry API tier)
+MAX_CONCURRENT_REQUESTS = int(os.environ.get("ANTHROPIC_MAX_CONCURRENCY", "8"))
+REQUESTS_PER_MINUTE = int(os.environ.get("ANTHROPIC_RPM", "40"))
+TOKENS_PER_MINUTE = int(os.environ.get("ANTHROPIC_TPM", "16000"))
+
+# Response cache - bump PROMPT_VERSION whenever the prompt or parser changes
+AI_CACHE_PATH = os.environ.get("AI_CACHE_PATH", "ai_cache.db")
+PROMPT_VERSION = "3"
+
+# Near-duplicate articles (cosine similarity above the threshold) reuse a cached analysis
+SEMANTIC_CACHE_MODEL = os.environ.get("SEMANTIC_CACHE_MODEL", "all-MiniLM-L6-v2")
+SEMANTIC_CACHE_THRESHOLD = float(os.environ.get("SEMANTIC_CACHE_THRESHOLD", "0.92"))
+
+# Static prompt blocks. Together they are far below the minimum cacheable
+# prompt length, so they are sent without cache_control breakpoints.
+SYSTEM_PROMPT = "You are a senior cybersecurity consultant briefing security analysts."
+
+# Simple prompt that avoids JSON formatting issues
+ANALYSIS_INSTRUCTIONS = """Analyze the cybersecurity article below for a security analyst.
+
+Please provide:
+1. A 2-3 paragraph executive summary
+2. 3-5 key takeaways for cybersecurity professionals
+3. Technical details worth noting
+4. Actionable items for implementation
+5. Relevance score (1-10) for cybersecurity analysts
+
+Format your response as plain text, not JSON."""
+
+# Appended to ANALYSIS_INSTRUCTIONS for prompts carrying several articles
+BULK_INSTRUCTIONS = """The message below contains several articles, each between
+---ARTICLE-N-START--- and ---ARTICLE-N-END--- markers. Analyze every article
+separately and wrap each analysis in matching ---RESULT-N-START--- and
+---RESULT-N-END--- markers using the same N."""
+_BULK_RESULT_RE = re.compile(r'---RESULT-(\d+)-START---(.*?)---RESULT-\1-END---', re.DOTALL)
+
+# Section headers in the analysis response, e.g. "1. Executive Summary",
+# "## Key Takeaways" or "Relevance Score: 8/10". A header line is short or
+# ends its label with a colon; anything after the colon belongs to the section.
+_SECTION_RE = re.compile(
+    r'^[ \t#*_]*(?:\d+\.[ \t]*)?[*_]*[ \t]*'
+    r'(executive summary|summary|key takeaway|takeaway|key point|insight|technical detail|technical'
+    r'|actionable item|actionable|action item|implementation|relevance score|relevance)s?\b'
+    r'(?:[^\n:]{0,40}:[*_]*[ \t]*(.*)|[^\n:]{0,40}?[*_]*[ \t]*)$',
+    re.IGNORECASE | re.MULTILINE
+)
+_SECTION_NAMES = {
+    'executive summary': 'summary',
+    'summary': 'summary',
+    'key takeaway': 'takeaways',
+    'takeaway': 'takeaways',
+    'key point': 'takeaways',
+    'insight': 'takeaways',
+    'technical detail': 'technical',
+    'technical': 'technical',
+    'actionable item': 'actionable',
+    'actionable': 'actionable',
+    'action item': 'actionable',
+    'implementation': 'actionable',
+    'relevance score': 'relevance',
+    'relevance': 'relevance',
+}
+_SECTION_HEADERS = {
+    'takeaways': "🎯 **KEY TAKEAWAYS:**",
+    'technical': "🔧 **TECHNICAL DETAILS:**",
+    'actionable': "✅ **ACTIONABLE ITEMS:**",
+    'relevance': "📊 **RELEVANCE SCORE:**",
+}
+# List markers ("•", or "-", "*", "1." followed by a space); "**bold**" lines are not bullets
+_BULLET_RE = re.compile(r'^(?:•\s*|(?:[*-]|\d+[.)])\s+)')
+
+# Over-long articles are trimmed by sentence, keeping the lead and security-relevant sentences
+LEAD_SENTENCES = 5
+_SENTENCE_RE = re.compile(r'(?<=[.!?])\s+')
+_KEY_SENTENCE_RE = re.compile(
+    r'\b(CVE-\d{4}-\d+|RCE|zero[- ]day|exploit\w*|patch\w*|vulnerab\w*|ransomware|malware)\b',
+    re.IGNORECASE
+)
+
+# Control characters (\x00-\x1f, \x7f-\x9f) map to spaces; str.translate beats a regex here
+_CONTROL_CHAR_TABLE = {code: ' ' for code in [*range(0x20), *range(0x7f, 0xa0)]}
+_WHITESPACE_RE = re.compile(r'\s+')
 
 def clean_text(text):
     """Clean text to remove problematic characters"""
     if not text:
         return text
     
-    # Remove control characters that break JSON
-    cleaned = re.sub(r'[\x00-\x1f\x7f-\x9f]', ' ', text)
-    # Replace multiple spaces with single space
-    cleaned = re.sub(r'\s+', ' ', cleaned)
-    return cleaned.strip()
+    # Replace control characters that break JSON, then collapse whitespace
+    return _WHITESPACE_RE.sub(' ', text.translate(_CONTROL_CHAR_TABLE)).strip()
 
-def summarize_article(content, title=""):
+@lru_cache(maxsize=1)
+def get_anthropic_client():
     """
-    Provide analysis of cybersecurity articles - simplified version
+    Create the Anthropic client on first use, or None without an API key.
+    Call get_anthropic_client.cache_clear() after rotating the key.
     """
-    if not anthropic_client:
-        logger.error("Anthropic client not initialized")
-        return None, None
+    api_key = os.environ.get("ANTHROPIC_API_KEY")
+    if not api_key:
+        return None
+    
+    return Anthropic(
+        api_key=api_key,
+        http_client=httpx.Client(http2=HTTP2_AVAILABLE, limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT)
+    )
+
+def select_models(content):
+    """Return the models to try for an article, preferred tier first"""
+    if DEEP_TIER_MIN_CHARS and len(content) >= DEEP_TIER_MIN_CHARS:
+        return [MODEL_DEEP, MODEL_FAST]
+    return [MODEL_FAST, MODEL_DEEP]
+
+def content_hash(content):
+    """Fingerprint article content to detect unchanged re-crawls"""
+    return hashlib.blake2b((content or "").encode("utf-8"), digest_size=16).hexdigest()
+
+def _cache_key(content, title):
+    """Build the response cache key for an article"""
+    raw = f"{PROMPT_VERSION}|{select_models(content)[0]}|{title}|{content}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+# One cache connection per thread, kept open so its compiled statements are reused
+_cache_local = threading.local()
+
+def _connect_cache():
+    """Return this thread's response cache connection, creating the tables on first use"""
+    conn = getattr(_cache_local, "conn", None)
+    if conn is not None:
+        return conn
+    
+    conn = sqlite3.connect(AI_CACHE_PATH, timeout=10)
+    conn.execute("PRAGMA journal_mode=WAL")  # worker threads read while another writes
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS analysis_cache (
+        key TEXT PRIMARY KEY,
+        summary TEXT,
+        key_points TEXT,
+        ts INTEGER
+    )
+    ''')
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS semantic_cache (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        prompt_version TEXT,
+        embedding BLOB,
+        summary TEXT,
+        key_points TEXT
+    )
+    ''')
+    _cache_local.conn = conn
+    return conn
+
+@lru_cache(maxsize=1)
+def get_embedder():
+    """Load the sentence embedding model once, or None if it is unavailable"""
+    if SentenceTransformer is None:
+        return None
     
     try:
-        # Limit content length
-        if len(content) > 8000:
-            content = content[:8000] + "..."
+        return SentenceTransformer(SEMANTIC_CACHE_MODEL)
+    except Exception as e:
+        logger.warning(f"Could not load embedding model {SEMANTIC_CACHE_MODEL}: {e}")
+        return None
+
+# In-memory copy of the semantic cache, loaded from SQLite on first use
+_semantic_lock = threading.Lock()
+_semantic_vectors = None
+_semantic_results = []
+
+def _embed(content, title):
+    embedder = get_embedder()
+    if embedder is None:
+        return None
+    text = f"{title}\n{content[:2000]}"
+    return embedder.encode([text], normalize_embeddings=True)[0].astype(np.float32)
+
+def _load_semantic_cache(conn):
+    global _semantic_vectors, _semantic_results
+    rows = conn.execute(
+        "SELECT embedding, summary, key_points FROM semantic_cache WHERE prompt_version = ?",
+        (PROMPT_VERSION,)
+    ).fetchall()
+    _semantic_results = [(summary, key_points) for _, summary, key_points in rows]
+    if rows:
+        _semantic_vectors = np.vstack([np.frombuffer(embedding, dtype=np.float32) for embedding, _, _ in rows])
+    else:
+        _semantic_vectors = np.empty((0, get_embedder().get_sentence_embedding_dimension()), dtype=np.float32)
+
+def get_similar_analysis(content, title=""):
+    """Return the cached analysis of a near-duplicate article, or None"""
+    try:
+        vector = _embed(content, title)
+        if vector is None:
+            return None
         
-        # Simple prompt that avoids JSON formatting issues
-        prompt = f"""Analyze this cybersecurity article for a security analyst:
+        with _semantic_lock:
+            if _semantic_vectors is None:
+                _load_semantic_cache(_connect_cache())
+            
+            if not _semantic_results:
+                return None
+            
+            scores = _semantic_vectors @ vector
+            best = int(scores.argmax())
+            if scores[best] >= SEMANTIC_CACHE_THRESHOLD:
+                return _semantic_results[best]
+        return None
+    except Exception as e:
+        logger.warning(f"Semantic cache lookup failed: {e}")
+        return None
 
-Title: {title}
+def store_similar_analysis(conn, content, title, summary, key_points):
+    """Add an analysis to the semantic cache using an open cache connection"""
+    global _semantic_vectors
+    try:
+        vector = _embed(content, title)
+        if vector is None:
+            return
+        
+        conn.execute(
+            "INSERT INTO semantic_cache (prompt_version, embedding, summary, key_points) VALUES (?, ?, ?, ?)",
+            (PROMPT_VERSION, vector.tobytes(), summary, key_points)
+        )
+        with _semantic_lock:
+            if _semantic_vectors is not None:
+                _semantic_vectors = np.vstack([_semantic_vectors, vector])
+                _semantic_results.append((summary, key_points))
+    except Exception as e:
+        logger.warning(f"Semantic cache write failed: {e}")
 
-Content: {content}
+# Lookup counters since process start, for hit-rate logging
+cache_stats = {"exact": 0, "semantic": 0, "miss": 0}
+_cache_stats_lock = threading.Lock()
 
-Please provide:
-1. A 2-3 paragraph executive summary
-2. 3-5 key takeaways for cybersecurity professionals
-3. Technical details worth noting
-4. Actionable items for implementation
-5. Relevance score (1-10) for cybersecurity analysts
+def _record_cache_lookup(tier, title):
+    with _cache_stats_lock:
+        cache_stats[tier] += 1
+        lookups = sum(cache_stats.values())
+        hit_rate = (lookups - cache_stats["miss"]) / lookups * 100
+    logger.info(f"Analysis cache {tier} for {title!r} (hit rate {hit_rate:.1f}% over {lookups} lookups)")
 
-Format your response as plain text, not JSON."""
+def get_cached_analysis(content, title=""):
+    """Return cached (summary, key_points) for an article or a near-duplicate, or None"""
+    try:
+        row = _connect_cache().execute(
+            "SELECT summary, key_points FROM analysis_cache WHERE key = ?",
+            (_cache_key(content, title),)
+        ).fetchone()
         
-        # Try multiple models
-        models = ["claude-3-5-sonnet-20241022", "claude-3-haiku-20240307"]
+        tier = "exact"
+        if not row:
+            row = get_similar_analysis(content, title)
+            tier = "semantic" if row else "miss"
+        _record_cache_lookup(tier, title)
+        return row
+    except Exception as e:
+        logger.warning(f"Analysis cache lookup failed: {e}")
+        return None
+
+def store_cached_analysis(content, title, summary, key_points):
+    """Store an analysis result in the response cache"""
+    try:
+        conn = _connect_cache()
+        with conn:  # commits, or rolls back on error
+            conn.execute(
+                "INSERT OR REPLACE INTO analysis_cache (key, summary, key_points, ts) VALUES (?, ?, ?, ?)",
+                (_cache_key(content, title), summary, key_points, int(time.time()))
+            )
+            store_similar_analysis(conn, content, title, summary, key_points)
+    except Exception as e:
+        logger.warning(f"Analysis cache write failed: {e}")
+
+def estimate_tokens(text):
+    """Rough input token estimate (~4 characters per token)"""
+    return len(text) // 4 + 1
+
+def truncate_to_tokens(text, max_tokens):
+    """Truncate text to about max_tokens (~4 characters per token)"""
+    max_chars = max_tokens * 4
+    return text[:max_chars] + "..." if len(text) > max_chars else text
+
+def trim_content(content, max_tokens=MAX_INPUT_TOKENS):
+    """
+    Fit content into max_tokens by whole sentences instead of a blind cut.
+    The lead sentences are kept first, then sentences mentioning CVEs,
+    exploits or patches, then the rest in order while budget remains.
+    """
+    if estimate_tokens(content) <= max_tokens:
+        return content
+    
+    sentences = _SENTENCE_RE.split(content)
+    lead = range(min(LEAD_SENTENCES, len(sentences)))
+    rest = range(len(lead), len(sentences))
+    priority = [*lead, *(i for i in rest if _KEY_SENTENCE_RE.search(sentences[i])),
+                *(i for i in rest if not _KEY_SENTENCE_RE.search(sentences[i]))]
+    
+    keep = set()
+    budget = max_tokens
+    for i in priority:
+        cost = estimate_tokens(sentences[i])
+        if cost <= budget:
+            keep.add(i)
+            budget -= cost
+    
+    if not keep:
+        return truncate_to_tokens(content, max_tokens)
+    return " ".join(sentences[i] for i in sorted(keep))
+
+def summarize_short_article(content, title=""):
+    """
+    Summarize a short article without an API call: lead sentences as summary,
+    the rest as takeaways. No relevance score is given, since nothing scored it.
+    """
+    sentences = [sentence for sentence in _SENTENCE_RE.split(clean_text(content)) if sentence]
+    summary = " ".join(sentences[:2])
+    points = [f"• {sentence}" for sentence in sentences[2:2 + SHORT_ARTICLE_MAX_POINTS]]
+    
+    key_points = "\n".join([
+        _SECTION_HEADERS['takeaways'],
+        *(points or ["• Short article - see the original source for details"]),
+        "",
+        "Not scored (short article, summarized without AI)"
+    ])
+    logger.info(f"Summarized short article locally: {title}")
+    return summary, key_points
+
+def build_analysis_prompt(content, title=""):
+    """Build the per-article part of the analysis prompt"""
+    content = trim_content(content)
+    
+    return f"""Title: {title}
+
+Content: {content}"""
+
+def build_analysis_request(content, title="", model=None, prompt=None):
+    """Build messages.create parameters for an article (prompt: a prebuilt build_analysis_prompt result)"""
+    model = model or select_models(content)[0]
+    return {
+        "model": model,
+        "max_tokens": FAST_MAX_TOKENS if model == MODEL_FAST else MAX_TOKENS,
+        "temperature": TEMPERATURE,
+        "system": [
+            {"type": "text", "text": SYSTEM_PROMPT}
+        ],
+        "messages": [{
+            "role": "user",
+            "content": [
+                {"type": "text", "text": ANALYSIS_INSTRUCTIONS},
+                {"type": "text", "text": prompt or build_analysis_prompt(content, title)}
+            ]
+        }]
+    }
+
+def build_bulk_analysis_request(articles, model=MODEL_FAST):
+    """Build messages.create parameters analyzing several (title, content) pairs at once"""
+    blocks = "\n\n".join(
+        f"---ARTICLE-{n}-START---\n{build_analysis_prompt(content, title)}\n---ARTICLE-{n}-END---"
+        for n, (title, content) in enumerate(articles, 1)
+    )
+    request = build_analysis_request("", model=model)
+    request["max_tokens"] = request["max_tokens"] * len(articles)
+    request["messages"][0]["content"][1:] = [
+        {"type": "text", "text": BULK_INSTRUCTIONS},
+        {"type": "text", "text": blocks}
+    ]
+    return request
+
+def parse_analysis_response(response_text, title=""):
+    """Split a plain text analysis into summary and key points"""
+    # Split on section headers: [preamble, name, inline text, body, name, inline text, body, ...]
+    parts = _SECTION_RE.split(response_text or "")
+    
+    summary_parts = []
+    key_point_lines = []
+    for i in range(1, len(parts), 3):
+        section = _SECTION_NAMES[parts[i].lower()]
+        body = f"{parts[i + 1] or ''}\n{parts[i + 2]}"
+        lines = [line for line in map(clean_text, body.splitlines()) if line]
         
-        for model in models:
-            try:
-                response = anthropic_client.messages.create(
-                    model=model,
-                    max_tokens=1500,
-                    temperature=0.3,
-                    messages=[{"role": "user", "content": prompt}]
-                )
-                
-                response_text = response.content[0].text
-                
-                # Clean the response
-                cleaned_response = clean_text(response_text)
-                
-                # Parse the plain text response
-                summary = ""
-                key_points = ""
-                
-                # Extract sections from the response
-                lines = cleaned_response.split('\n')
-                current_section = ""
-                
-                for line in lines:
-                    line = line.strip()
-                    if not line:
-                        continue
-                    
-                    # Look for section headers
-                    if any(keyword in line.lower() for keyword in ['summary', 'executive']):
-                        current_section = "summary"
-                        continue
-                    elif any(keyword in line.lower() for keyword in ['takeaway', 'key points', 'insights']):
-                        current_section = "takeaways"
-                        key_points += "\n🎯 **KEY TAKEAWAYS:**\n"
-                        continue
-                    elif any(keyword in line.lower() for keyword in ['technical', 'details']):
-                        current_section = "technical"
-                        key_points += "\n🔧 **TECHNICAL DETAILS:**\n"
-                        continue
-                    elif any(keyword in line.lower() for keyword in ['actionable', 'action', 'implementation']):
-                        current_section = "actionable"
-                        key_points += "\n✅ **ACTIONABLE ITEMS:**\n"
-                        continue
-                    elif any(keyword in line.lower() for keyword in ['relevance', 'score']):
-                        current_section = "relevance"
-                        key_points += "\n📊 **RELEVANCE SCORE:**\n"
-                        continue
-                    
-                    # Add content to appropriate section
-                    if current_section == "summary":
-                        summary += line + " "
-                    elif current_section in ["takeaways", "technical", "actionable", "relevance"]:
-                        if line.startswith(('•', '-', '1.', '2.', '3.', '4.', '5.')):
-                            key_points += f"• {line.lstrip('•-123456789. ')}\n"
-                        else:
-                            key_points += f"{line}\n"
+        if section == 'summary':
+            summary_parts.extend(lines)
+            continue
+        
+        key_point_lines += ["", _SECTION_HEADERS[section]]
+        for line in lines:
+            bullet = _BULLET_RE.match(line)
+            key_point_lines.append(f"• {line[bullet.end():]}" if bullet else line)
+    
+    summary = " ".join(summary_parts)
+    key_points = "\n".join(key_point_lines)
+    
+    # Fallback if parsing didn't work well
+    if not summary or not key_points:
+        cleaned_response = clean_text(response_text)
+        if not summary:
+            summary = f"Analysis of {title}: " + cleaned_response[:300] + "..."
+        if not key_points:
+            key_points = f"🤖 **ANALYSIS:**\n{cleaned_response[:800]}...\n\n📊 **STATUS:** Analysis completed successfully"
+    
+    return summary.strip(), key_points.strip()
+
+class RateLimiter:
+    """Thread-safe sliding-window limiter for requests and tokens per minute"""
+    
+    def __init__(self, rpm, tpm):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.requests = deque()  # timestamps of recent requests
+        self.tokens = deque()  # (timestamp, tokens) of recent requests
+        self.token_total = 0
+        self.blocked_until = 0
+        # Waiters sleep in condition.wait(), which releases the lock for other threads and penalize()
+        self.condition = threading.Condition()
+    
+    def _expire(self, now):
+        while self.requests and now - self.requests[0] >= 60:
+            self.requests.popleft()
+        while self.tokens and now - self.tokens[0][0] >= 60:
+            self.token_total -= self.tokens.popleft()[1]
+    
+    def acquire(self, tokens_needed):
+        """Block until a request using tokens_needed fits in both budgets"""
+        tokens_needed = min(tokens_needed, self.tpm)
+        with self.condition:
+            while True:
+                now = time.monotonic()
+                self._expire(now)
                 
-                # Fallback if parsing didn't work well
-                if not summary:
-                    summary = f"Analysis of {title}: " + cleaned_response[:300] + "..."
+                wait = self.blocked_until - now
+                if len(self.requests) >= self.rpm:
+                    wait = max(wait, self.requests[0] + 60 - now)
+                if self.token_total + tokens_needed > self.tpm and self.tokens:
+                    wait = max(wait, self.tokens[0][0] + 60 - now)
                 
-                if not key_points:
-                    key_points = f"🤖 **ANALYSIS:**\n{cleaned_response[:800]}...\n\n📊 **STATUS:** Analysis completed successfully"
+                if wait <= 0:
+                    self.requests.append(now)
+                    self.tokens.append((now, tokens_needed))
+                    self.token_total += tokens_needed
+                    return
+                self.condition.wait(wait)
+    
+    def penalize(self, seconds):
+        """Hold all requests for the given number of seconds (e.g. from retry-after)"""
+        with self.condition:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+            # Waiters re-check now, so they don't wake at the old time and slip past the penalty
+            self.condition.notify_all()
+
+rate_limiter = RateLimiter(REQUESTS_PER_MINUTE, TOKENS_PER_MINUTE)
+
+def stream_analysis_text(content, title="", model=None):
+    """
+    Yield analysis text from Claude as it is generated.
+    Streaming also surfaces a dropped connection immediately rather than at the end.
+    """
+    client = get_anthropic_client()
+    if not client:
+        raise RuntimeError("Anthropic client not initialized")
+    
+    model = model or select_models(content)[0]
+    prompt = build_analysis_prompt(content, title)
+    rate_limiter.acquire(estimate_tokens(ANALYSIS_INSTRUCTIONS + prompt))
+    with client.messages.stream(**build_analysis_request(content, title, model, prompt)) as stream:
+        yield from stream.text_stream
+
+def finish_analysis(content, title, response_text):
+    """Parse a complete streamed analysis and store it in the cache"""
+    summary, key_points = parse_analysis_response(response_text, title)
+    store_cached_analysis(content, title, summary, key_points)
+    return summary, key_points
+
+def summarize_article(content, title="", use_cache=True):
+    """
+    Provide analysis of cybersecurity articles - simplified version
+    Set use_cache=False to force a fresh analysis.
+    """
+    if use_cache:
+        cached = get_cached_analysis(content, title)
+        if cached:
+            logger.info(f"Using cached analysis: {title}")
+            return cached
+    
+    if not get_anthropic_client():
+        logger.error("Anthropic client not initialized")
+        return None, None
+    
+    try:
+        # Try multiple models
+        for model in select_models(content):
+            try:
+                response_text = "".join(stream_analysis_text(content, title, model))
+                summary, key_points = finish_analysis(content, title, response_text)
                 
                 logger.info(f"Successfully analyzed using {model}: {title}")
-                return summary.strip(), key_points.strip()
+                return summary, key_points
                 
+            except RateLimitError as e:
+                retry_after = float(e.response.headers.get("retry-after", 60))
+                rate_limiter.penalize(retry_after)
+                logger.warning(f"Model {model} rate limited, backing off {retry_after}s")
+                continue
             except Exception as e:
                 logger.warning(f"Model {model} failed: {e}")
                 continue
@@ -131,14 +588,146 @@ Format your response as plain text, not JSON."""
         logger.error(f"Error in analysis: {e}")
         return None, None
 
+class TokenBucket:
+    """Async limiter for both requests per minute and tokens per minute"""
+    
+    def __init__(self, rpm, tpm):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.requests = rpm
+        self.tokens = tpm
+        self.updated = time.monotonic()
+        self.blocked_until = 0
+        self.lock = asyncio.Lock()
+    
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self.updated
+        self.updated = now
+        self.requests = min(self.rpm, self.requests + elapsed * self.rpm / 60)
+        self.tokens = min(self.tpm, self.tokens + elapsed * self.tpm / 60)
+    
+    async def acquire(self, tokens):
+        """Wait until one request and the given number of tokens are available"""
+        tokens = min(tokens, self.tpm)
+        async with self.lock:
+            while True:
+                blocked = self.blocked_until - time.monotonic()
+                if blocked > 0:
+                    await asyncio.sleep(blocked)
+                    continue
+                
+                self._refill()
+                if self.requests >= 1 and self.tokens >= tokens:
+                    self.requests -= 1
+                    self.tokens -= tokens
+                    return
+                wait = max(
+                    (1 - self.requests) * 60 / self.rpm,
+                    (tokens - self.tokens) * 60 / self.tpm
+                )
+                await asyncio.sleep(wait)
+    
+    def penalize(self, seconds):
+        """Hold all requests for the given number of seconds (e.g. from retry-after)"""
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+async def summarize_article_async(client, limiter, content, title="", use_cache=True):
+    """Async variant of summarize_article sharing a client and rate limiter"""
+    # The cache does blocking sqlite3 (and embedding) work, so it runs off the event loop
+    if use_cache:
+        cached = await asyncio.to_thread(get_cached_analysis, content, title)
+        if cached:
+            return cached
+    
+    prompt = build_analysis_prompt(content, title)
+    tokens = estimate_tokens(ANALYSIS_INSTRUCTIONS + prompt)
+    for model in select_models(content):
+        try:
+            params = build_analysis_request(content, title, model, prompt)
+            await limiter.acquire(tokens)
+            response = await client.messages.create(**params)
+            
+            summary, key_points = parse_analysis_response(response.content[0].text, title)
+            await asyncio.to_thread(store_cached_analysis, content, title, summary, key_points)
+            
+            logger.info(f"Successfully analyzed using {model}: {title}")
+            return summary, key_points
+            
+        except RateLimitError as e:
+            # Still limited after the SDK's retries: pause every coroutine, not just this one
+            retry_after = float(e.response.headers.get("retry-after", 60))
+            limiter.penalize(retry_after)
+            logger.warning(f"Model {model} rate limited for {title}, backing off {retry_after}s")
+            continue
+        except Exception as e:
+            logger.warning(f"Model {model} failed for {title}: {e}")
+            continue
+    
+    return None, None
+
+@lru_cache(maxsize=1)
+def get_event_loop():
+    """
+    Start one event loop on a daemon thread for all async analysis runs, so the
+    AsyncAnthropic pool and rate limiter outlive a single call and callers
+    that already run an event loop (Streamlit, Flask) can still submit work.
+    """
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="ai-service-loop", daemon=True).start()
+    return loop
+
+@lru_cache(maxsize=1)
+def get_async_anthropic_client():
+    """AsyncAnthropic client bound to get_event_loop(), or None without an API key"""
+    api_key = os.environ.get("ANTHROPIC_API_KEY")
+    if not api_key:
+        return None
+    
+    # The SDK retries 429/5xx responses with exponential backoff itself
+    return AsyncAnthropic(
+        api_key=api_key,
+        max_retries=4,
+        http_client=httpx.AsyncClient(http2=HTTP2_AVAILABLE, limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT)
+    )
+
+@lru_cache(maxsize=1)
+def get_token_bucket():
+    """Shared async limiter, so back-to-back runs stay within the per-minute limits"""
+    return TokenBucket(REQUESTS_PER_MINUTE, TOKENS_PER_MINUTE)
+
+async def _summarize_all(articles, use_cache=True):
+    client = get_async_anthropic_client()
+    limiter = get_token_bucket()
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    
+    async def analyze(article_id, title, content):
+        async with semaphore:
+            return article_id, await summarize_article_async(client, limiter, content, title, use_cache)
+    
+    results = await asyncio.gather(*(analyze(*article) for article in articles))
+    return dict(results)
+
+def summarize_articles(articles, use_cache=True):
+    """
+    Analyze (id, title, content) tuples concurrently within the API rate limits.
+    Returns a dict of id -> (summary, key_points); failed analyses are (None, None).
+    Set use_cache=False to force fresh analyses.
+    """
+    if not get_async_anthropic_client() or not articles:
+        return {}
+    
+    return asyncio.run_coroutine_threadsafe(_summarize_all(articles, use_cache), get_event_loop()).result()
+
 def test_anthropic_connection():
     """Test Anthropic connection"""
-    if not anthropic_client:
+    client = get_anthropic_client()
+    if not client:
         return False, "Anthropic API key not configured"
     
     try:
-        response = anthropic_client.messages.create(
-            model="claude-3-haiku-20240307",
+        response = client.messages.create(
+            model=MODEL_FAST,
             max_tokens=50,
             messages=[{"role": "user", "content": "Hello, test connection"}]
         )
@@ -146,7 +735,8 @@ def test_anthropic_connection():
     except Exception as e:
         return False, f"Connection failed: {str(e)}"
 
-# Compatibility functions for Flask mode
+# Compatibility functions for Flask mode (the import result never changes, so cache it)
+@lru_cache(maxsize=1)
 def get_db():
     try:
         from app import db
@@ -154,6 +744,7 @@ def get_db():
     except (ImportError, RuntimeError):
         return None
 
+@lru_cache(maxsize=1)
 def get_article_model():
     try:
         from models import Article
@@ -161,39 +752,360 @@ def get_article_model():
     except ImportError:
         return None
 
+@lru_cache(maxsize=1)
+def get_pending_batch_model():
+    try:
+        from models import PendingBatch
+        return PendingBatch
+    except ImportError:
+        return None
+
+def submit_analysis_batch(articles):
+    """Submit (id, title, content) tuples as one Message Batches job and return its id"""
+    requests = [
+        {
+            "custom_id": str(article_id),
+            "params": build_analysis_request(content, title)
+        }
+        for article_id, title, content in articles
+    ]
+    
+    batch = get_anthropic_client().messages.batches.create(requests=requests)
+    logger.info(f"Submitted batch {batch.id} with {len(requests)} articles")
+    return batch.id
+
+def collect_analysis_batch(batch_id, articles):
+    """
+    Read the results of an ended batch submitted for (id, title, content) tuples.
+    Returns a dict of id -> (summary, key_points) for successful requests.
+    """
+    by_id = {str(article[0]): article for article in articles}
+    
+    analyses = {}
+    for entry in get_anthropic_client().messages.batches.results(batch_id):
+        if entry.result.type != "succeeded":
+            logger.warning(f"Batch request {entry.custom_id} {entry.result.type}")
+            continue
+        if entry.custom_id not in by_id:
+            continue
+        
+        article_id, title, content = by_id[entry.custom_id]
+        summary, key_points = parse_analysis_response(entry.result.message.content[0].text, title)
+        store_cached_analysis(content, title, summary, key_points)
+        analyses[article_id] = (summary, key_points)
+    
+    logger.info(f"Batch {batch_id} ended with {len(analyses)} of {len(articles)} articles analyzed")
+    return analyses
+
+def queue_analysis_batch(db, articles):
+    """
+    Submit (id, title, content) tuples missing from the cache as Message Batches
+    jobs without waiting on them. Each job is saved as a PendingBatch straight
+    after submission, so drain_batches() collects its results later.
+    Returns (dict of id -> (summary, key_points) cache hits, number submitted).
+    """
+    analyses = {}
+    pending = []
+    for article_id, title, content in articles:
+        cached = get_cached_analysis(content, title)
+        if cached:
+            analyses[article_id] = cached
+        else:
+            pending.append((article_id, title, content))
+    
+    PendingBatch = get_pending_batch_model()
+    if not PendingBatch or not get_anthropic_client():
+        return analyses, 0
+    
+    submitted = 0
+    for start in range(0, len(pending), BATCH_MAX_REQUESTS):
+        chunk = pending[start:start + BATCH_MAX_REQUESTS]
+        try:
+            batch_id = submit_analysis_batch(chunk)
+            db.session.add(PendingBatch(
+                batch_id=batch_id,
+                article_ids=",".join(str(article_id) for article_id, _, _ in chunk)
+            ))
+            db.session.commit()
+            submitted += len(chunk)
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Error submitting analysis batch: {e}")
+    
+    return analyses, submitted
+
+def _in_flight_article_ids(db):
+    """Ids of articles submitted in batches that have not been drained yet"""
+    PendingBatch = get_pending_batch_model()
+    if not PendingBatch:
+        return set()
+    
+    article_ids = set()
+    for (ids,) in db.session.query(PendingBatch.article_ids).filter(PendingBatch.status == 'in_progress'):
+        article_ids.update(int(article_id) for article_id in ids.split(','))
+    return article_ids
+
+def _unprocessed_pages(db, Article, page_size=ANALYSIS_PAGE_SIZE):
+    """
+    Yield unprocessed articles page_size rows at a time, keyset-paged by id so
+    each page can be saved (and committed) before the next is read.
+    """
+    last_id = 0
+    while True:
+        # Only the columns needed for analysis, as plain rows rather than ORM objects
+        page = db.session.query(
+            Article.id, Article.title, Article.content, Article.summary, Article.content_hash, Article.token_count
+        ).filter(Article.processed == False, Article.id > last_id).order_by(Article.id).limit(page_size).all()
+        if not page:
+            return
+        yield page
+        last_id = page[-1][0]
+
+def _select_articles_to_analyze(rows, in_flight):
+    """
+    Split a page of unprocessed article rows into row updates that need no
+    analysis and (id, title, content) tuples that do, plus the content hash
+    and stored token count of each. Articles in in_flight are skipped.
+    """
+    updates = []
+    to_analyze = []
+    hashes = {}
+    token_counts = {}
+    for article_id, title, content, summary, previous_hash, token_count in rows:
+        if article_id in in_flight:
+            continue
+        
+        if not content or len(content.strip()) < 200:
+            updates.append({"id": article_id, "processed": True})
+            continue
+        
+        # Already summarized and the text hasn't changed since
+        hashes[article_id] = content_hash(content)
+        if summary and previous_hash == hashes[article_id]:
+            updates.append({"id": article_id, "processed": True})
+            continue
+        
+        if len(content) < SHORT_ARTICLE_CHARS:
+            summary, key_points = summarize_short_article(content, title)
+            updates.append({
+                "id": article_id,
+                "summary": summary,
+                "key_points": key_points,
+                "content_hash": hashes[article_id],
+                "processed": True
+            })
+            continue
+        
+        to_analyze.append((article_id, title, content))
+        if token_count:
+            token_counts[article_id] = token_count
+    
+    return updates, to_analyze, hashes, token_counts
+
+def _save_analyses(db, Article, analyses, hashes, updates=None):
+    """Write analysis results (plus any extra row updates) back in chunked bulk updates"""
+    updates = list(updates or [])
+    
+    processed_count = 0
+    for article_id, (summary, key_points) in analyses.items():
+        if summary and key_points:
+            updates.append({
+                "id": article_id,
+                "summary": summary,
+                "key_points": key_points,
+                "content_hash": hashes[article_id],
+                "processed": True
+            })
+            processed_count += 1
+        else:
+            updates.append({"id": article_id, "processed": True})  # Mark as processed to avoid retry loops
+    
+    try:
+        for start in range(0, len(updates), UPDATE_CHUNK_SIZE):
+            db.session.bulk_update_mappings(Article, updates[start:start + UPDATE_CHUNK_SIZE])
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error saving processed articles: {e}")
+        return 0
+    
+    return processed_count
+
+def summarize_article_group(group):
+    """
+    Analyze a group of (id, title, content) tuples in a single request.
+    Articles missing from the response are analyzed individually.
+    """
+    analyses = {}
+    pending = []
+    for article_id, title, content in group:
+        cached = get_cached_analysis(content, title)
+        if cached:
+            analyses[article_id] = cached
+        else:
+            pending.append((article_id, title, content))
+    
+    if len(pending) > 1:
+        try:
+            request = build_bulk_analysis_request([(title, content) for _, title, content in pending])
+            rate_limiter.acquire(sum(estimate_tokens(block["text"]) for block in request["messages"][0]["content"]))
+            with get_anthropic_client().messages.stream(**request) as stream:
+                response_text = "".join(stream.text_stream)
+            
+            for match in _BULK_RESULT_RE.finditer(response_text):
+                n = int(match.group(1))
+                if 1 <= n <= len(pending):
+                    article_id, title, content = pending[n - 1]
+                    analyses[article_id] = finish_analysis(content, title, match.group(2))
+            logger.info(f"Bulk analyzed {len(analyses)} of {len(group)} articles in one request")
+        except RateLimitError as e:
+            rate_limiter.penalize(float(e.response.headers.get("retry-after", 60)))
+            logger.warning(f"Bulk analysis rate limited: {e}")
+        except Exception as e:
+            logger.warning(f"Bulk analysis failed, falling back to single requests: {e}")
+    
+    for article_id, title, content in pending:
+        if article_id not in analyses:
+            analyses[article_id] = summarize_article(content, title)
+    return analyses
+
+def summarize_articles_bulk(articles, batch_size=BULK_BATCH_SIZE, token_counts=None):
+    """
+    Analyze (id, title, content) tuples, packing short articles up to batch_size
+    and BULK_GROUP_TOKENS to a prompt. token_counts maps ids to stored token
+    counts; articles without one are estimated from their length.
+    Returns a dict of id -> (summary, key_points); failed analyses are (None, None).
+    """
+    token_counts = token_counts or {}
+    tokens = {
+        article_id: token_counts.get(article_id) or estimate_tokens(content or "")
+        for article_id, _, content in articles
+    }
+    short = [article for article in articles if tokens[article[0]] <= BULK_MAX_TOKENS]
+    long = [article for article in articles if tokens[article[0]] > BULK_MAX_TOKENS]
+    
+    # First-fit decreasing: largest articles first, each into the first group with room
+    groups = []
+    group_tokens = []
+    for article in sorted(short, key=lambda article: tokens[article[0]], reverse=True):
+        cost = tokens[article[0]]
+        for i, group in enumerate(groups):
+            if len(group) < batch_size and group_tokens[i] + cost <= BULK_GROUP_TOKENS:
+                group.append(article)
+                group_tokens[i] += cost
+                break
+        else:
+            groups.append([article])
+            group_tokens.append(cost)
+    
+    analyses = {}
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS) as executor:
+        futures = [executor.submit(summarize_article_group, group) for group in groups]
+        futures += [
+            executor.submit(lambda a: {a[0]: summarize_article(a[2], a[1])}, article)
+            for article in long
+        ]
+        for future in as_completed(futures):
+            analyses.update(future.result())
+    return analyses
+
 def process_new_articles():
-    """Process unprocessed articles"""
+    """
+    Process unprocessed articles a page at a time with bulk prompts or async
+    requests, or queue them as Message Batches jobs for drain_batches() to collect.
+    """
     db = get_db()
     Article = get_article_model()
     
     if not db or not Article:
         return 0
     
-    unprocessed_articles = Article.query.filter_by(processed=False).all()
+    in_flight = _in_flight_article_ids(db)
     processed_count = 0
+    for rows in _unprocessed_pages(db, Article):
+        updates, to_analyze, hashes, token_counts = _select_articles_to_analyze(rows, in_flight)
+        
+        analyses = {}
+        if to_analyze:
+            try:
+                if USE_BATCH_API:
+                    analyses, submitted = queue_analysis_batch(db, to_analyze)
+                    logger.info(f"Queued {submitted} articles for batch analysis")
+                elif BULK_BATCH_SIZE > 1:
+                    analyses = summarize_articles_bulk(to_analyze, token_counts=token_counts)
+                else:
+                    analyses = summarize_articles(to_analyze)
+            except Exception as e:
+                logger.error(f"Error analyzing articles: {e}")
+        
+        processed_count += _save_analyses(db, Article, analyses, hashes, updates)
     
-    for article in unprocessed_articles:
-        if not article.content or len(article.content.strip()) < 200:
-            article.processed = True
-            continue
+    return processed_count
+
+def process_backlog(max_items=10000):
+    """
+    Submit up to max_items unprocessed articles as Message Batches jobs without
+    waiting on them; drain_batches() collects the results later.
+    Returns the number of articles submitted.
+    """
+    db = get_db()
+    Article = get_article_model()
+    
+    if not db or not Article:
+        return 0
+    
+    in_flight = _in_flight_article_ids(db)
+    remaining = max_items
+    submitted = 0
+    for rows in _unprocessed_pages(db, Article):
+        updates, to_analyze, hashes, _ = _select_articles_to_analyze(rows, in_flight)
+        to_analyze = to_analyze[:remaining]
         
+        # Cache hits are saved straight away and never submitted
+        analyses, queued = queue_analysis_batch(db, to_analyze)
+        _save_analyses(db, Article, analyses, hashes, updates)
+        
+        submitted += queued
+        remaining -= len(to_analyze)
+        if remaining <= 0:
+            break
+    
+    logger.info(f"Submitted {submitted} backlog articles for batch analysis")
+    return submitted
+
+def drain_batches():
+    """Collect results of ended analysis batches. Returns the number of articles analyzed."""
+    db = get_db()
+    Article = get_article_model()
+    PendingBatch = get_pending_batch_model()
+    
+    client = get_anthropic_client()
+    if not db or not Article or not PendingBatch or not client:
+        return 0
+    
+    processed_count = 0
+    for pending_batch in PendingBatch.query.filter_by(status='in_progress').all():
         try:
-            summary, key_points = summarize_article(article.content, article.title)
+            batch = client.messages.batches.retrieve(pending_batch.batch_id)
+            if batch.processing_status != "ended":
+                continue
             
-            if summary and key_points:
-                article.summary = summary
-                article.key_points = key_points
-                article.processed = True
-                processed_count += 1
-            else:
-                article.processed = True  # Mark as processed to avoid retry loops
+            article_ids = [int(article_id) for article_id in pending_batch.article_ids.split(',')]
+            articles = db.session.query(
+                Article.id, Article.title, Article.content
+            ).filter(Article.id.in_(article_ids)).all()
             
-            db.session.commit()
+            analyses = collect_analysis_batch(pending_batch.batch_id, articles)
+            hashes = {article_id: content_hash(content) for article_id, _, content in articles}
+            processed_count += _save_analyses(db, Article, analyses, hashes)
             
-        except Exception as e:
-            logger.error(f"Error processing {article.title}: {e}")
-            article.processed = True
+            # Articles whose requests failed stay unprocessed for the next run
+            pending_batch.status = 'ended'
+            pending_batch.completed_date = datetime.utcnow()
             db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Error draining batch {pending_batch.batch_id}: {e}")
     
     return processed_count
 
@@ -210,15 +1122,43 @@ def reprocess_article(article_id, db_instance=None):
             return False, "Article not found"
         
         title, content = article_data[0]
-        summary, key_points = summarize_article(content, title)
+        summary, key_points = summarize_article(content, title, use_cache=False)
         
         if summary and key_points:
             db_instance.execute_query(
-                "UPDATE articles SET summary = ?, key_points = ?, processed = 1 WHERE id = ?",
-                (summary, key_points, article_id)
+                "UPDATE articles SET summary = ?, key_points = ?, content_hash = ?, processed = 1 WHERE id = ?",
+                (summary, key_points, content_hash(content), article_id)
             )
             return True, "Article reprocessed successfully"
         else:
             return False, "Failed to reprocess article"
     
     return False, "Database not available"
+
+def reprocess_articles(article_ids, db_instance):
+    """Re-analyze several articles concurrently and save them in one transaction; returns the number saved"""
+    article_ids = list(article_ids)
+    if not article_ids:
+        return 0
+    
+    placeholders = ','.join('?' * len(article_ids))
+    articles = db_instance.execute_query(
+        f"SELECT id, title, content FROM articles WHERE id IN ({placeholders}) AND content IS NOT NULL",
+        article_ids,
+        fetch=True
+    )
+    results = summarize_articles(articles, use_cache=False)
+    
+    analyses = []
+    for article_id, title, content in articles:
+        summary, key_points = results.get(article_id, (None, None))
+        if summary and key_points:
+            analyses.append((summary, key_points, content_hash(content), article_id))
+        else:
+            logger.error(f"Failed to reprocess: {title}")
+    
+    db_instance.execute_many(
+        "UPDATE articles SET summary = ?, key_points = ?, content_hash = ?, processed = 1 WHERE id = ?",
+        analyses
+    )
+    return len(analyses)
@@ -1,7 +1,10 @@
 import os
 import logging
+import sqlite3
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event, inspect, text
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import DeclarativeBase
 from werkzeug.middleware.proxy_fix import ProxyFix
 
@@ -20,10 +23,55 @@ app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1)
 
 # Configure the database
 app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get("DATABASE_URL", "sqlite:///blog_monitor.db")
-app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
-    "pool_recycle": 300,
-    "pool_pre_ping": True,
-}
+if not app.config["SQLALCHEMY_DATABASE_URI"].startswith("sqlite"):
+    # Guards against a database server dropping idle connections; a SQLite file connection
+    # never goes stale, and recycling it would throw away its page cache every few minutes
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
+        "pool_recycle": 300,
+        "pool_pre_ping": True,
+    }
+
+@event.listens_for(Engine, "connect")
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Apply WAL and the per-connection PRAGMAs to each new SQLite connection"""
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")  # persists in the file; page reads no longer wait on scheduler writes
+    cursor.execute("PRAGMA synchronous=NORMAL")  # safe with WAL, far fewer fsyncs
+    cursor.execute("PRAGMA cache_size=-20000")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+# Columns added to existing tables since they were first created, as (table, column, type).
+# create_all() only creates missing tables, so migrate_schema() adds these in place.
+SCHEMA_MIGRATIONS = [
+    ('article', 'content_hash', 'VARCHAR(32)'),
+    ('article', 'token_count', 'INTEGER'),
+    ('blog_source', 'etag', 'VARCHAR(200)'),
+    ('blog_source', 'modified', 'VARCHAR(100)'),
+]
+
+def migrate_schema():
+    """
+    Add any SCHEMA_MIGRATIONS columns and model indexes missing from an older
+    database; safe to run on every start.
+    """
+    inspector = inspect(db.engine)
+    columns = {}
+    with db.engine.begin() as conn:
+        for table, column, column_type in SCHEMA_MIGRATIONS:
+            if table not in columns:
+                columns[table] = {info['name'] for info in inspector.get_columns(table)}
+            if column not in columns[table]:
+                conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}"))
+                columns[table].add(column)
+                logging.info(f"Added column {table}.{column}")
+    
+    # create_all() doesn't add indexes to tables that already exist either
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(db.engine, checkfirst=True)
 
 # Initialize the app with the extension
 db.init_app(app)
@@ -32,6 +80,7 @@ with app.app_context():
     # Import models to ensure tables are created
     import models
     db.create_all()
+    migrate_schema()
     
     # Import routes
     import routes
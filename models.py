@@ -1,15 +1,25 @@
 from app import db
 from datetime import datetime
 from sqlalchemy import Text, Boolean, DateTime
+from sqlalchemy.orm import deferred
 
 class Article(db.Model):
+    __table_args__ = (
+        db.Index('ix_article_processed_scraped', 'processed', 'scraped_date'),
+        db.Index('ix_article_source_scraped', 'source', 'scraped_date'),
+        db.Index('ix_article_scraped_date', 'scraped_date'),
+        db.Index('ix_article_notify', 'processed', 'notification_sent', 'scraped_date'),
+    )
+    
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(500), nullable=False)
     url = db.Column(db.String(1000), unique=True, nullable=False)
     source = db.Column(db.String(200), nullable=False)
-    content = db.Column(Text)
+    content = deferred(db.Column(Text))  # raw article text, only loaded when analyzing
     summary = db.Column(Text)
     key_points = db.Column(Text)
+    content_hash = db.Column(db.String(32), index=True)  # blake2b of the content, set on ingest
+    token_count = db.Column(db.Integer)  # estimated content length in tokens, set on ingest
     published_date = db.Column(DateTime)
     scraped_date = db.Column(DateTime, default=datetime.utcnow)
     processed = db.Column(Boolean, default=False)
@@ -38,11 +48,17 @@ class BlogSource(db.Model):
     active = db.Column(Boolean, default=True)
     created_date = db.Column(DateTime, default=datetime.utcnow)
     last_scraped = db.Column(DateTime)
+    etag = db.Column(db.String(200))  # RSS validators for conditional GETs
+    modified = db.Column(db.String(100))
     
     def __repr__(self):
         return f'<BlogSource {self.name}>'
 
 class ScrapingLog(db.Model):
+    __table_args__ = (
+        db.Index('ix_scraping_log_ts', 'timestamp'),
+    )
+    
     id = db.Column(db.Integer, primary_key=True)
     source = db.Column(db.String(200), nullable=False)
     status = db.Column(db.String(50), nullable=False)  # success, error, no_new_articles
@@ -52,3 +68,14 @@ class ScrapingLog(db.Model):
     
     def __repr__(self):
         return f'<ScrapingLog {self.source} - {self.status}>'
+
+class PendingBatch(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    batch_id = db.Column(db.String(100), unique=True, nullable=False)
+    article_ids = db.Column(Text, nullable=False)  # comma-separated Article ids
+    status = db.Column(db.String(50), default='in_progress')  # in_progress, ended
+    submitted_date = db.Column(DateTime, default=datetime.utcnow)
+    completed_date = db.Column(DateTime)
+    
+    def __repr__(self):
+        return f'<PendingBatch {self.batch_id} - {self.status}>'
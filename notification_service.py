@@ -1,6 +1,10 @@
 import os
+import html
 import smtplib
 import logging
+import threading
+import time
+from functools import lru_cache
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from twilio.rest import Client
@@ -22,8 +26,132 @@ TWILIO_AUTH_TOKEN = os.environ.get("TWILIO_AUTH_TOKEN")
 TWILIO_PHONE_NUMBER = os.environ.get("TWILIO_PHONE_NUMBER")
 TWILIO_WHATSAPP_NUMBER = f"whatsapp:{TWILIO_PHONE_NUMBER}" if TWILIO_PHONE_NUMBER else "whatsapp:+14155238886"
 
-def send_email_notification(to_email, subject, body):
-    """Send email notification"""
+# Notification settings change rarely; re-read them at most this often (seconds),
+# so an edit to NotificationSettings takes effect within this delay
+SETTINGS_CACHE_TTL = int(os.environ.get("SETTINGS_CACHE_TTL", "600"))
+_settings_cache = {'value': None, 'expires': 0}
+
+# Most articles in one digest; a larger backlog goes out as several digests
+# over the same SMTP connection
+NOTIFY_MAX_ARTICLES = 200
+
+# Article ids per bulk "notification sent" UPDATE
+NOTIFY_UPDATE_CHUNK_SIZE = 500
+
+# Stay under Twilio's 25 messages/second cap for text messages
+WHATSAPP_MESSAGES_PER_SECOND = float(os.environ.get("WHATSAPP_MESSAGES_PER_SECOND", "20"))
+
+class SendRateLimiter:
+    """Thread-safe token bucket that blocks until a send is allowed"""
+    
+    def __init__(self, rate, per=1.0):
+        self.rate = rate
+        self.per = per
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self):
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate / self.per)
+            self.updated = now
+            if self.tokens < 1:
+                time.sleep((1 - self.tokens) * self.per / self.rate)
+                self.tokens = 1
+                self.updated = time.monotonic()
+            self.tokens -= 1
+
+whatsapp_rate_limiter = SendRateLimiter(WHATSAPP_MESSAGES_PER_SECOND)
+
+# Static parts of the email digest, built once
+EMAIL_HEADER = """
+    <html>
+    <head>
+        <style>
+            body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; }
+            .header { background-color: #007bff; color: white; padding: 20px; text-align: center; }
+            .article { margin: 20px 0; padding: 15px; border-left: 4px solid #007bff; background-color: #f8f9fa; }
+            .article-title { font-size: 18px; font-weight: bold; margin-bottom: 10px; }
+            .article-source { color: #6c757d; font-size: 14px; margin-bottom: 10px; }
+            .article-summary { margin-bottom: 15px; }
+            .key-points { margin-bottom: 15px; }
+            .key-points ul { margin: 5px 0; padding-left: 20px; }
+            .read-more { display: inline-block; background-color: #007bff; color: white; padding: 8px 16px; text-decoration: none; border-radius: 4px; }
+            .footer { margin-top: 30px; padding: 20px; background-color: #f8f9fa; text-align: center; color: #6c757d; }
+        </style>
+    </head>
+    <body>
+        <div class="header">
+            <h1>🔒 Cybersecurity Articles Digest</h1>
+            <p>New articles from your monitored cybersecurity blogs</p>
+        </div>
+    """
+
+EMAIL_ARTICLE_TEMPLATE = """
+        <div class="article">
+            <div class="article-title">{title}</div>
+            <div class="article-source">Source: {source}</div>
+            
+            <div class="article-summary">
+                <strong>Summary:</strong><br>
+                {summary}
+            </div>
+            
+            <div class="key-points">
+                <strong>Key Points:</strong><br>
+                {key_points}
+            </div>
+            
+            <a href="{url}" class="read-more">Read Full Article</a>
+        </div>
+        """
+
+EMAIL_FOOTER = """
+        <div class="footer">
+            <p>This digest was automatically generated by your Blog Monitor application.</p>
+        </div>
+    </body>
+    </html>
+    """
+
+class SMTPConnection:
+    """
+    Authenticated SMTP session reused for several messages. It connects on the
+    first message, not on entering the block, and reconnects if the server drops it.
+    """
+    
+    def __init__(self):
+        self.server = None
+    
+    def connect(self):
+        self.server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT)
+        self.server.starttls()
+        self.server.login(EMAIL_ADDRESS, EMAIL_PASSWORD)
+    
+    def sendmail(self, to_email, text):
+        if self.server is None:
+            self.connect()
+        try:
+            self.server.sendmail(EMAIL_ADDRESS, to_email, text)
+        except smtplib.SMTPServerDisconnected:
+            self.connect()
+            self.server.sendmail(EMAIL_ADDRESS, to_email, text)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        if self.server is None:
+            return
+        try:
+            self.server.quit()
+        except (smtplib.SMTPException, OSError):
+            pass
+        self.server = None
+
+def send_email_notification(to_email, subject, body, connection=None):
+    """Send email notification, over an open SMTPConnection if one is given"""
     if not EMAIL_ADDRESS or not EMAIL_PASSWORD:
         logger.error("Email credentials not configured")
         return False
@@ -39,12 +167,11 @@ def send_email_notification(to_email, subject, body):
         msg.attach(MIMEText(body, 'html'))
         
         # Send email
-        server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT)
-        server.starttls()
-        server.login(EMAIL_ADDRESS, EMAIL_PASSWORD)
-        text = msg.as_string()
-        server.sendmail(EMAIL_ADDRESS, to_email, text)
-        server.quit()
+        if connection:
+            connection.sendmail(to_email, msg.as_string())
+        else:
+            with SMTPConnection() as connection:
+                connection.sendmail(to_email, msg.as_string())
         
         logger.info(f"Email sent successfully to {to_email}")
         return True
@@ -53,6 +180,11 @@ def send_email_notification(to_email, subject, body):
         logger.error(f"Error sending email to {to_email}: {e}")
         return False
 
+@lru_cache(maxsize=1)
+def get_twilio_client():
+    """Twilio client shared by all sends, so its HTTPS session stays alive between messages"""
+    return Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
+
 def send_whatsapp_notification(to_number, message):
     """Send WhatsApp notification using Twilio"""
     if not TWILIO_ACCOUNT_SID or not TWILIO_AUTH_TOKEN:
@@ -60,13 +192,14 @@ def send_whatsapp_notification(to_number, message):
         return False
     
     try:
-        client = Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
+        client = get_twilio_client()
         
         # Ensure phone number is in correct format
         if not to_number.startswith("whatsapp:"):
             to_number = f"whatsapp:{to_number}"
         
         # Send message
+        whatsapp_rate_limiter.acquire()
         message = client.messages.create(
             body=message,
             from_=TWILIO_WHATSAPP_NUMBER,
@@ -80,149 +213,143 @@ def send_whatsapp_notification(to_number, message):
         logger.error(f"Error sending WhatsApp message to {to_number}: {e}")
         return False
 
+def html_paragraphs(text, default):
+    """Escape text for HTML and keep its line breaks"""
+    return html.escape(text).replace('\n', '<br>') if text else default
+
 def format_email_body(articles):
     """Format articles for email notification"""
-    html_body = """
-    <html>
-    <head>
-        <style>
-            body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; }
-            .header { background-color: #007bff; color: white; padding: 20px; text-align: center; }
-            .article { margin: 20px 0; padding: 15px; border-left: 4px solid #007bff; background-color: #f8f9fa; }
-            .article-title { font-size: 18px; font-weight: bold; margin-bottom: 10px; }
-            .article-source { color: #6c757d; font-size: 14px; margin-bottom: 10px; }
-            .article-summary { margin-bottom: 15px; }
-            .key-points { margin-bottom: 15px; }
-            .key-points ul { margin: 5px 0; padding-left: 20px; }
-            .read-more { display: inline-block; background-color: #007bff; color: white; padding: 8px 16px; text-decoration: none; border-radius: 4px; }
-            .footer { margin-top: 30px; padding: 20px; background-color: #f8f9fa; text-align: center; color: #6c757d; }
-        </style>
-    </head>
-    <body>
-        <div class="header">
-            <h1>🔒 Cybersecurity Articles Digest</h1>
-            <p>New articles from your monitored cybersecurity blogs</p>
-        </div>
-    """
-    
-    # Define newline replacement outside f-string
-    br_tag = '<br>'
-    newline = '\n'
+    parts = [EMAIL_HEADER]
+    parts.extend(
+        EMAIL_ARTICLE_TEMPLATE.format_map({
+            'title': html.escape(article.title),
+            'source': html.escape(article.source),
+            'summary': html_paragraphs(article.summary, 'Summary not available'),
+            'key_points': html_paragraphs(article.key_points, 'Key points not available'),
+            'url': html.escape(article.url, quote=True)
+        })
+        for article in articles
+    )
+    parts.append(EMAIL_FOOTER)
     
-    for article in articles:
-        # Pre-process content to avoid backslashes in f-strings
-        summary_content = article.summary.replace(newline, br_tag) if article.summary else 'Summary not available'
-        key_points_content = article.key_points.replace(newline, br_tag) if article.key_points else 'Key points not available'
-        
-        html_body += f"""
-        <div class="article">
-            <div class="article-title">{article.title}</div>
-            <div class="article-source">Source: {article.source}</div>
-            
-            <div class="article-summary">
-                <strong>Summary:</strong><br>
-                {summary_content}
-            </div>
-            
-            <div class="key-points">
-                <strong>Key Points:</strong><br>
-                {key_points_content}
-            </div>
-            
-            <a href="{article.url}" class="read-more">Read Full Article</a>
-        </div>
-        """
-    
-    html_body += """
-        <div class="footer">
-            <p>This digest was automatically generated by your Blog Monitor application.</p>
-        </div>
-    </body>
-    </html>
-    """
-    
-    return html_body
+    return "".join(parts)
 
 def format_whatsapp_message(articles):
     """Format articles for WhatsApp notification (with character limits)"""
     if not articles:
         return "No new cybersecurity articles found."
     
-    message = "🔒 *Cybersecurity Articles Digest*\n\n"
+    parts = ["🔒 *Cybersecurity Articles Digest*\n\n"]
     
     for i, article in enumerate(articles[:3], 1):  # Limit to 3 articles for WhatsApp
-        message += f"*{i}. {article.title[:80]}{'...' if len(article.title) > 80 else ''}*\n"
-        message += f"📰 Source: {article.source}\n"
+        parts.append(f"*{i}. {article.title[:80]}{'...' if len(article.title) > 80 else ''}*\n")
+        parts.append(f"📰 Source: {article.source}\n")
         
         # Add summary (truncated)
         if article.summary:
             summary = article.summary[:200] + "..." if len(article.summary) > 200 else article.summary
-            message += f"📝 {summary}\n"
+            parts.append(f"📝 {summary}\n")
         
         # Add URL
-        message += f"🔗 {article.url}\n\n"
+        parts.append(f"🔗 {article.url}\n\n")
     
-    if len(articles) > 3:
-        message += f"... and {len(articles) - 3} more articles available in your dashboard."
+    remaining = len(articles) - 3
+    if remaining > 0:
+        parts.append(f"... and {remaining} more articles available in your dashboard.")
     
-    return message
+    return "".join(parts)
+
+def get_notification_settings():
+    """Notification settings as a plain dict (None if unset), cached for SETTINGS_CACHE_TTL seconds"""
+    now = time.monotonic()
+    if now >= _settings_cache['expires']:
+        settings = NotificationSettings.query.first()
+        _settings_cache['value'] = {
+            'email_enabled': settings.email_enabled,
+            'email_address': settings.email_address,
+            'whatsapp_enabled': settings.whatsapp_enabled,
+            'whatsapp_number': settings.whatsapp_number
+        } if settings else None
+        _settings_cache['expires'] = now + SETTINGS_CACHE_TTL
+    return _settings_cache['value']
 
 def send_notifications_for_new_articles():
     """Send notifications for articles that haven't been notified yet"""
     logger.info("Checking for articles to notify...")
     
     # Get notification settings
-    settings = NotificationSettings.query.first()
+    settings = get_notification_settings()
     if not settings:
         logger.warning("No notification settings found")
         return
     
-    # Get articles that need notification
-    articles_to_notify = Article.query.filter_by(
-        processed=True,
-        notification_sent=False
-    ).order_by(Article.scraped_date.desc()).all()
-    
-    if not articles_to_notify:
-        logger.info("No new articles to notify")
-        return
-    
-    logger.info(f"Found {len(articles_to_notify)} articles to notify")
+    # Check credentials before anything connects to the mail server
+    send_email = bool(settings['email_enabled'] and settings['email_address'])
+    if send_email and (not EMAIL_ADDRESS or not EMAIL_PASSWORD):
+        logger.error("Email credentials not configured")
+        send_email = False
     
-    # Send email notification
-    if settings.email_enabled and settings.email_address:
-        try:
-            subject = f"🔒 {len(articles_to_notify)} New Cybersecurity Articles"
-            body = format_email_body(articles_to_notify)
+    # One connection (TLS handshake and login) for every digest in this run
+    with SMTPConnection() as connection:
+        while True:
+            # Get articles that need notification
+            articles_to_notify = Article.query.filter_by(
+                processed=True,
+                notification_sent=False
+            ).order_by(Article.scraped_date.desc()).limit(NOTIFY_MAX_ARTICLES).all()
             
-            if send_email_notification(settings.email_address, subject, body):
-                logger.info("Email notification sent successfully")
-            else:
-                logger.error("Failed to send email notification")
-        except Exception as e:
-            logger.error(f"Error sending email notification: {e}")
-    
-    # Send WhatsApp notification
-    if settings.whatsapp_enabled and settings.whatsapp_number:
-        try:
-            message = format_whatsapp_message(articles_to_notify)
+            if not articles_to_notify:
+                logger.info("No new articles to notify")
+                return
+            
+            logger.info(f"Found {len(articles_to_notify)} articles to notify")
+            
+            # Send email notification
+            if send_email:
+                try:
+                    subject = f"🔒 {len(articles_to_notify)} New Cybersecurity Articles"
+                    body = format_email_body(articles_to_notify)
+                    
+                    if send_email_notification(settings['email_address'], subject, body, connection):
+                        logger.info("Email notification sent successfully")
+                    else:
+                        logger.error("Failed to send email notification")
+                except Exception as e:
+                    logger.error(f"Error sending email notification: {e}")
+            
+            # Send WhatsApp notification
+            if settings['whatsapp_enabled'] and settings['whatsapp_number']:
+                try:
+                    message = format_whatsapp_message(articles_to_notify)
+                    
+                    if send_whatsapp_notification(settings['whatsapp_number'], message):
+                        logger.info("WhatsApp notification sent successfully")
+                    else:
+                        logger.error("Failed to send WhatsApp notification")
+                except Exception as e:
+                    logger.error(f"Error sending WhatsApp notification: {e}")
             
-            if send_whatsapp_notification(settings.whatsapp_number, message):
-                logger.info("WhatsApp notification sent successfully")
-            else:
-                logger.error("Failed to send WhatsApp notification")
-        except Exception as e:
-            logger.error(f"Error sending WhatsApp notification: {e}")
-    
-    # Mark articles as notified
+            # Stop rather than resend the same digest if these can't be marked
+            if not mark_articles_notified(articles_to_notify):
+                return
+            if len(articles_to_notify) < NOTIFY_MAX_ARTICLES:
+                return
+
+def mark_articles_notified(articles):
+    """Mark articles as notified with one UPDATE per chunk (SQLite caps bound parameters)"""
     try:
-        for article in articles_to_notify:
-            article.notification_sent = True
+        ids = [article.id for article in articles]
+        for start in range(0, len(ids), NOTIFY_UPDATE_CHUNK_SIZE):
+            Article.query.filter(Article.id.in_(ids[start:start + NOTIFY_UPDATE_CHUNK_SIZE])).update(
+                {Article.notification_sent: True}, synchronize_session=False
+            )
         db.session.commit()
-        logger.info(f"Marked {len(articles_to_notify)} articles as notified")
+        logger.info(f"Marked {len(articles)} articles as notified")
+        return True
     except Exception as e:
         db.session.rollback()
         logger.error(f"Error marking articles as notified: {e}")
+        return False
 
 def test_email_configuration():
     """Test email configuration"""
@@ -230,10 +357,8 @@ def test_email_configuration():
         return False, "Email credentials not configured"
     
     try:
-        server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT)
-        server.starttls()
-        server.login(EMAIL_ADDRESS, EMAIL_PASSWORD)
-        server.quit()
+        with SMTPConnection() as connection:
+            connection.connect()
         return True, "Email configuration is working"
     except Exception as e:
         return False, f"Email configuration error: {str(e)}"
@@ -244,7 +369,7 @@ def test_whatsapp_configuration():
         return False, "Twilio credentials not configured"
     
     try:
-        client = Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
+        get_twilio_client()
         # Just initialize client to test credentials
         return True, "WhatsApp configuration is working"
     except Exception as e:
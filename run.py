@@ -7,6 +7,7 @@ import os
 import sys
 import subprocess
 import logging
+from importlib.metadata import distributions
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -18,25 +19,21 @@ def check_dependencies():
         'streamlit',
         'flask',
         'flask-sqlalchemy', 
-        'openai',
+        'anthropic',
         'requests',
         'beautifulsoup4',
         'feedparser',
         'trafilatura',
         'twilio',
-        'apscheduler',
-        'pandas'
+        'apscheduler'
     ]
     
-    missing_packages = []
-    
-    for package in required_packages:
-        try:
-            __import__(package.replace('-', '_'))
-        except ImportError:
-            missing_packages.append(package)
-    
-    return missing_packages
+    # Compare against installed distribution names instead of importing every package
+    installed = {
+        (dist.metadata['Name'] or '').lower().replace('_', '-')
+        for dist in distributions()
+    }
+    return [package for package in required_packages if package not in installed]
 
 def install_dependencies():
     """Install missing dependencies"""
@@ -111,12 +108,12 @@ def main():
         else:
             logger.error("requirements.txt not found. Please install dependencies manually.")
             return
-    
-    # Check again after installation
-    missing_after = check_dependencies()
-    if missing_after:
-        logger.warning(f"Some packages still missing: {missing_after}")
-        logger.info("The application will run with limited functionality.")
+        
+        # Check again after installation
+        missing_after = check_dependencies()
+        if missing_after:
+            logger.warning(f"Some packages still missing: {missing_after}")
+            logger.info("The application will run with limited functionality.")
     
     # Run the application
     run_streamlit()
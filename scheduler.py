@@ -1,7 +1,8 @@
 import logging
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.interval import IntervalTrigger
-from datetime import datetime
+from apscheduler.executors.pool import ThreadPoolExecutor
+from datetime import datetime, timedelta
 import atexit
 
 logger = logging.getLogger(__name__)
@@ -20,6 +21,30 @@ def scraping_job():
     except Exception as e:
         logger.error(f"Error in scheduled scraping job: {e}")
 
+def batch_drain_job():
+    """Scheduled job to collect results of finished analysis batches"""
+    try:
+        from app import app
+        with app.app_context():
+            from ai_service import drain_batches
+            processed_count = drain_batches()
+            if processed_count:
+                logger.info(f"Batch drain completed. Analyzed {processed_count} articles")
+    except Exception as e:
+        logger.error(f"Error in batch drain job: {e}")
+
+def backlog_job():
+    """Scheduled job to queue unprocessed articles as Message Batches jobs"""
+    try:
+        from app import app
+        with app.app_context():
+            from ai_service import process_backlog
+            submitted = process_backlog()
+            if submitted:
+                logger.info(f"Backlog job queued {submitted} articles for batch analysis")
+    except Exception as e:
+        logger.error(f"Error in backlog job: {e}")
+
 def cleanup_job():
     """Scheduled job to cleanup old logs and data"""
     try:
@@ -28,17 +53,13 @@ def cleanup_job():
         with app.app_context():
             from app import db
             from models import ScrapingLog
-            from datetime import datetime, timedelta
             
-            # Remove scraping logs older than 30 days
+            # Remove scraping logs older than 30 days with one bulk DELETE
             cutoff_date = datetime.utcnow() - timedelta(days=30)
-            old_logs = ScrapingLog.query.filter(ScrapingLog.timestamp < cutoff_date).all()
-            
-            for log in old_logs:
-                db.session.delete(log)
+            deleted = ScrapingLog.query.filter(ScrapingLog.timestamp < cutoff_date).delete(synchronize_session=False)
             
             db.session.commit()
-            logger.info(f"Cleanup completed. Removed {len(old_logs)} old log entries")
+            logger.info(f"Cleanup completed. Removed {deleted} old log entries")
         
     except Exception as e:
         logger.error(f"Error in cleanup job: {e}")
@@ -52,7 +73,12 @@ def start_scheduler():
         return
     
     try:
-        scheduler = BackgroundScheduler()
+        # A long scrape shouldn't block the other jobs, and missed runs collapse
+        # into one instead of firing back to back when the scheduler catches up
+        scheduler = BackgroundScheduler(
+            executors={'default': ThreadPoolExecutor(4)},
+            job_defaults={'coalesce': True, 'max_instances': 1, 'misfire_grace_time': 600}
+        )
         
         # Schedule scraping every 2 hours
         scheduler.add_job(
@@ -64,6 +90,26 @@ def start_scheduler():
             next_run_time=datetime.now()  # Run immediately on startup
         )
         
+        # Collect finished analysis batches every 15 minutes
+        scheduler.add_job(
+            func=batch_drain_job,
+            trigger=IntervalTrigger(minutes=15),
+            id='batch_drain_job',
+            name='Collect analysis batch results',
+            replace_existing=True
+        )
+        
+        # Queue whatever is still unprocessed (e.g. after a failed batch) every day at 2 AM
+        scheduler.add_job(
+            func=backlog_job,
+            trigger='cron',
+            hour=2,
+            minute=0,
+            id='backlog_job',
+            name='Queue unprocessed articles for batch analysis',
+            replace_existing=True
+        )
+        
         # Schedule cleanup every day at 3 AM
         scheduler.add_job(
             func=cleanup_job,
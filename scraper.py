@@ -1,23 +1,73 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import feedparser
 import trafilatura
 from bs4 import BeautifulSoup
+import soupsieve
 from urllib.parse import urljoin, urlparse
 from datetime import datetime, timedelta
+from collections import defaultdict, OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from flask import current_app
 import logging
 from app import db
-from models import Article, ScrapingLog
+from models import Article, ScrapingLog, BlogSource
+from ai_service import content_hash, estimate_tokens, process_new_articles
 import time
+import threading
 
 logger = logging.getLogger(__name__)
 
+# Sources on different hosts are scraped in parallel; sources sharing a host run in turn
+SCRAPE_MAX_WORKERS = 8
+SAME_HOST_DELAY = 2
+
+# One keep-alive session for all scraping requests, with retries on transient errors
+http_session = requests.Session()
+http_session.headers['User-Agent'] = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+http_adapter = HTTPAdapter(
+    pool_connections=SCRAPE_MAX_WORKERS, pool_maxsize=32,
+    max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=[502, 503, 504])
+)
+http_session.mount('https://', http_adapter)
+http_session.mount('http://', http_adapter)
+
+_default_sources_checked = False
+
+# Common selectors for article links on blog index pages, compiled once into one selector
+ARTICLE_LINK_SELECTOR = soupsieve.compile(', '.join([
+    'a[href*="/blog/"]',
+    'a[href*="/post/"]',
+    'a[href*="/article/"]',
+    'h2 a', 'h3 a',
+    '.post-title a',
+    '.article-title a',
+    '.entry-title a'
+]))
+ARTICLE_LINK_LIMIT = 80
+
+# Recently stored article URLs, so repeat scrapes skip the database for known links
+SEEN_URLS_MAX = 50000
+_seen_urls = OrderedDict()
+_seen_urls_lock = threading.Lock()
+_seen_urls_primed = False
+_seen_urls_prime_lock = threading.Lock()  # separate from _seen_urls_lock, which remember_urls takes
+
+# Serializes the de-duplicate-and-commit step of scrape_blog across host-group threads
+_article_save_lock = threading.Lock()
+
 def initialize_default_sources():
     """Initialize default blog sources if none exist"""
-    from app import db
-    from models import BlogSource
+    global _default_sources_checked
+    
+    # Sources are only ever seeded once, so the check only needs to run once per process
+    if _default_sources_checked:
+        return
     
     # Check if any sources exist
-    if BlogSource.query.count() > 0:
+    if db.session.query(BlogSource.id).first():
+        _default_sources_checked = True
         return
     
     logger.info("Initializing default blog sources...")
@@ -73,31 +123,82 @@ def initialize_default_sources():
         db.session.add(source)
     
     db.session.commit()
+    _default_sources_checked = True
     logger.info(f"Added {len(default_sources)} default blog sources")
 
 def get_website_text_content(url):
     """Extract clean text content from a website using trafilatura"""
     try:
-        downloaded = trafilatura.fetch_url(url)
-        if downloaded:
-            text = trafilatura.extract(downloaded)
-            return text
-        return None
+        response = http_session.get(url, timeout=10)
+        response.raise_for_status()
+        return trafilatura.extract(response.content)
     except Exception as e:
         logger.error(f"Error extracting content from {url}: {e}")
         return None
 
+def remember_urls(urls):
+    """Add stored article URLs to the seen-URL LRU"""
+    with _seen_urls_lock:
+        for url in urls:
+            _seen_urls[url] = True
+            _seen_urls.move_to_end(url)
+        while len(_seen_urls) > SEEN_URLS_MAX:
+            _seen_urls.popitem(last=False)
+
+def get_existing_urls(urls):
+    """Return the subset of urls already stored, checking the seen-URL LRU before the database"""
+    global _seen_urls_primed
+    if not urls:
+        return set()
+    
+    # Checked again under the lock so parallel host groups prime once, and only marked
+    # primed after the query succeeds so a failure is retried on the next call
+    if not _seen_urls_primed:
+        with _seen_urls_prime_lock:
+            if not _seen_urls_primed:
+                recent = db.session.query(Article.url).order_by(Article.id.desc()).limit(SEEN_URLS_MAX).all()
+                remember_urls(url for (url,) in reversed(recent))
+                _seen_urls_primed = True
+    
+    with _seen_urls_lock:
+        existing = {url for url in urls if url in _seen_urls}
+    
+    missing = [url for url in urls if url not in existing]
+    if missing:
+        found = {url for (url,) in db.session.query(Article.url).filter(Article.url.in_(missing))}
+        remember_urls(found)
+        existing |= found
+    return existing
+
 def scrape_rss_feed(blog_config):
     """Scrape articles from RSS feed"""
     articles = []
     try:
-        feed = feedparser.parse(blog_config['rss_feed'])
+        # Conditional GET: an unchanged feed answers 304 with no body to download or parse
+        headers = {}
+        if blog_config.get('etag'):
+            headers['If-None-Match'] = blog_config['etag']
+        if blog_config.get('modified'):
+            headers['If-Modified-Since'] = blog_config['modified']
+        
+        response = http_session.get(blog_config['rss_feed'], headers=headers, timeout=10)
+        if response.status_code == 304:
+            logger.info(f"RSS feed for {blog_config['name']} not modified")
+            return articles
+        response.raise_for_status()
+        
+        # Saved with the articles by scrape_blog, so a failed save is retried next run
+        blog_config['new_etag'] = response.headers.get('ETag')
+        blog_config['new_modified'] = response.headers.get('Last-Modified')
+        feed = feedparser.parse(response.content)
         logger.info(f"Parsing RSS feed for {blog_config['name']}: {len(feed.entries)} entries found")
         
-        for entry in feed.entries[:5]:  # Limit to recent 5 articles
+        entries = feed.entries[:5]  # Limit to recent 5 articles
+        known_urls = get_existing_urls([entry.link for entry in entries])
+        
+        for entry in entries:
             # Check if article already exists
-            existing = Article.query.filter_by(url=entry.link).first()
-            if existing:
+            if entry.link in known_urls:
                 continue
             
             # Parse published date
@@ -126,46 +227,31 @@ def scrape_website_links(blog_config):
     """Scrape article links directly from website"""
     articles = []
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        
-        response = requests.get(blog_config['url'], headers=headers, timeout=10)
+        response = http_session.get(blog_config['url'], timeout=10)
         response.raise_for_status()
         
-        soup = BeautifulSoup(response.content, 'html.parser')
+        soup = BeautifulSoup(response.content, 'lxml')
         
         # Find article links based on common patterns
         article_links = set()
         
-        # Common selectors for article links
-        selectors = [
-            'a[href*="/blog/"]',
-            'a[href*="/post/"]',
-            'a[href*="/article/"]',
-            'h2 a', 'h3 a',
-            '.post-title a',
-            '.article-title a',
-            '.entry-title a'
-        ]
-        
-        for selector in selectors:
-            links = soup.select(selector)
-            for link in links[:10]:  # Limit to avoid too many requests
-                href = link.get('href')
-                if href:
-                    full_url = urljoin(blog_config['url'], href)
-                    if full_url.startswith('http'):
-                        article_links.add(full_url)
+        # Common article link patterns, matched in a single pass over the page
+        for link in ARTICLE_LINK_SELECTOR.select(soup, limit=ARTICLE_LINK_LIMIT):  # Limit to avoid too many requests
+            href = link.get('href')
+            if href:
+                full_url = urljoin(blog_config['url'], href)
+                if full_url.startswith('http'):
+                    article_links.add(full_url)
         
         logger.info(f"Found {len(article_links)} potential articles for {blog_config['name']}")
         
         # Process each article link
-        for url in list(article_links)[:5]:  # Limit to 5 recent articles
+        candidate_urls = list(article_links)[:5]  # Limit to 5 recent articles
+        known_urls = get_existing_urls(candidate_urls)
+        for url in candidate_urls:
             try:
                 # Check if article already exists
-                existing = Article.query.filter_by(url=url).first()
-                if existing:
+                if url in known_urls:
                     continue
                 
                 # Get article content
@@ -202,7 +288,8 @@ def extract_title_from_content(content):
     if not content:
         return None
     
-    lines = content.strip().split('\n')
+    # Titles sit at the top, so only split the start of the article
+    lines = content[:4096].strip().split('\n')
     for line in lines[:5]:  # Check first few lines
         line = line.strip()
         if len(line) > 10 and len(line) < 200:  # Reasonable title length
@@ -226,84 +313,153 @@ def scrape_blog(blog_config):
         error_message = str(e)
         logger.error(f"Error scraping {blog_config['name']}: {e}")
     
-    # Save articles to database
-    saved_count = 0
+    # Host groups scrape in parallel but save one at a time, so two groups can't both
+    # pass the content-hash check for the same republished post
+    with _article_save_lock:
+        return save_scraped_articles(blog_config, articles, error_message)
+
+def save_scraped_articles(blog_config, articles, error_message=None):
+    """Store a source's new articles, its scraping log and feed validators in one commit"""
+    # Every row is validated here because one bad row fails the single commit below
+    saved_urls = []
+    seen_urls = set()
+    
+    # The same post is often republished across sources; look up every content hash
+    # in the batch with one query and skip copies of known content
     for article_data in articles:
-        try:
-            article = Article(**article_data)
-            db.session.add(article)
-            db.session.commit()
-            saved_count += 1
-            logger.info(f"Saved article: {article_data['title']}")
-        except Exception as e:
-            db.session.rollback()
-            logger.error(f"Error saving article: {e}")
+        if article_data.get('content'):
+            article_data['content_hash'] = content_hash(article_data['content'])
+    batch_hashes = {article_data['content_hash'] for article_data in articles if article_data.get('content_hash')}
+    seen_hashes = set()
+    if batch_hashes:
+        seen_hashes = {
+            value for (value,) in
+            db.session.query(Article.content_hash).filter(Article.content_hash.in_(batch_hashes))
+        }
     
-    # Log scraping result
+    for article_data in articles:
+        url = article_data.get('url')
+        if not url or not article_data.get('title') or not article_data.get('source') or url in seen_urls:
+            logger.info(f"Skipping invalid or repeated article: {url}")
+            continue
+        seen_urls.add(url)
+        
+        if article_data.get('content_hash'):
+            if article_data['content_hash'] in seen_hashes:
+                logger.info(f"Skipping duplicate article: {article_data['title']}")
+                continue
+            seen_hashes.add(article_data['content_hash'])
+            article_data['token_count'] = estimate_tokens(article_data['content'])
+        
+        db.session.add(Article(**article_data))
+        saved_urls.append(url)
+        logger.info(f"Saved article: {article_data['title']}")
+    saved_count = len(saved_urls)
+    
+    # The log row rides in the same commit as the articles
     status = 'error' if error_message else ('success' if saved_count > 0 else 'no_new_articles')
-    log_entry = ScrapingLog(
+    db.session.add(ScrapingLog(
         source=blog_config['name'],
         status=status,
         message=error_message or f"Found {saved_count} new articles",
         articles_found=saved_count
-    )
+    ))
     
     try:
-        db.session.add(log_entry)
+        if blog_config.get('id') and 'new_etag' in blog_config:
+            BlogSource.query.filter_by(id=blog_config['id']).update({
+                BlogSource.etag: blog_config['new_etag'],
+                BlogSource.modified: blog_config['new_modified']
+            }, synchronize_session=False)
         db.session.commit()
+        remember_urls(saved_urls)
     except Exception as e:
         db.session.rollback()
-        logger.error(f"Error saving scraping log: {e}")
+        saved_count = 0
+        logger.error(f"Error committing articles for {blog_config['name']}: {e}")
+        
+        # The rollback took the log row with it; record the failure on its own
+        try:
+            db.session.add(ScrapingLog(
+                source=blog_config['name'],
+                status='error',
+                message=f"Error saving articles: {e}",
+                articles_found=0
+            ))
+            db.session.commit()
+        except Exception as log_error:
+            db.session.rollback()
+            logger.error(f"Error saving scraping log: {log_error}")
     
     return saved_count
 
+def scrape_host_group(app, blog_configs):
+    """Scrape sources that share a host one after another, in a worker thread"""
+    total = 0
+    with app.app_context():
+        for i, blog_config in enumerate(blog_configs):
+            if i:
+                time.sleep(SAME_HOST_DELAY)
+            try:
+                total += scrape_blog(blog_config)
+            except Exception as e:
+                logger.error(f"Error scraping {blog_config['name']}: {e}")
+    return total
+
 def scrape_all_sources():
     """Scrape all configured blog sources from database"""
-    from app import db
-    from models import BlogSource
-    from datetime import datetime
-    
     logger.info("Starting scraping of all sources...")
     
     # Initialize default sources if none exist
     initialize_default_sources()
     
-    # Get active blog sources from database
-    blog_sources = BlogSource.query.filter_by(active=True).all()
+    # Get active blog sources from database, as plain rows
+    blog_sources = db.session.query(
+        BlogSource.id, BlogSource.name, BlogSource.url, BlogSource.scrape_type, BlogSource.rss_url,
+        BlogSource.etag, BlogSource.modified
+    ).filter_by(active=True).all()
     
     if not blog_sources:
         logger.warning("No active blog sources found in database")
         return 0
     
+    # Group sources by host so each host still sees one request stream at a time
+    host_groups = defaultdict(list)
+    for source_id, name, url, scrape_type, rss_url, etag, modified in blog_sources:
+        host_groups[urlparse(url).netloc].append({
+            'id': source_id,
+            'name': name,
+            'url': url,
+            'type': scrape_type,
+            'rss_feed': rss_url,
+            'etag': etag,
+            'modified': modified
+        })
+    
+    app = current_app._get_current_object()
     total_articles = 0
+    with ThreadPoolExecutor(max_workers=SCRAPE_MAX_WORKERS) as executor:
+        futures = [executor.submit(scrape_host_group, app, configs) for configs in host_groups.values()]
+        for future in as_completed(futures):
+            try:
+                total_articles += future.result()
+            except Exception as e:
+                logger.error(f"Error scraping sources: {e}")
     
-    for source in blog_sources:
-        try:
-            blog_config = {
-                'name': source.name,
-                'url': source.url,
-                'type': source.scrape_type,
-                'rss_feed': source.rss_url
-            }
-            
-            count = scrape_blog(blog_config)
-            total_articles += count
-            
-            # Update last_scraped timestamp
-            source.last_scraped = datetime.utcnow()
-            db.session.commit()
-            
-            # Rate limiting between sources
-            time.sleep(2)
-            
-        except Exception as e:
-            logger.error(f"Error scraping {source.name}: {e}")
+    # Update last_scraped timestamps
+    try:
+        BlogSource.query.filter(BlogSource.id.in_([source.id for source in blog_sources])).update(
+            {BlogSource.last_scraped: datetime.utcnow()}, synchronize_session=False
+        )
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error updating last scraped times: {e}")
     
     logger.info(f"Scraping completed. Total new articles: {total_articles}")
     
     # Process new articles for summarization
     if total_articles > 0:
-        from ai_service import process_new_articles
         process_new_articles()
     
     return total_articles
@@ -1,12 +1,19 @@
 import streamlit as st
-import pandas as pd
 from datetime import datetime, timedelta
 import os
 import sqlite3
 import logging
+import atexit
+import json
 import threading
 import time
-import json
+import queue
+import re
+from collections import defaultdict
+from contextlib import contextmanager
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import unquote_plus, urljoin, urlparse, urlsplit, urlunsplit
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -20,8 +27,9 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Set environment variables from Streamlit secrets
-if hasattr(st, 'secrets'):
+@st.cache_resource
+def load_secrets():
+    """Copy Streamlit secrets into os.environ once per process, not on every rerun"""
     try:
         for key, value in st.secrets.items():
             if isinstance(value, dict):
@@ -30,7 +38,14 @@ if hasattr(st, 'secrets'):
             else:
                 os.environ[key] = str(value)
     except Exception as e:
-        st.warning(f"Could not load secrets: {e}")
+        return str(e)
+    return None
+
+# Set environment variables from Streamlit secrets
+if hasattr(st, 'secrets'):
+    secrets_error = load_secrets()
+    if secrets_error:
+        st.warning(f"Could not load secrets: {secrets_error}")
 
 # Check for required imports
 MISSING_IMPORTS = []
@@ -44,43 +59,158 @@ except ImportError:
     MISSING_IMPORTS.append("Anthropic")
 
 try:
-    import requests
+    import httpx
     import feedparser
     import trafilatura
     from bs4 import BeautifulSoup
+    import soupsieve
     SCRAPING_AVAILABLE = True
 except ImportError:
     MISSING_IMPORTS.append("Web scraping libraries")
 
-# Custom CSS
-st.markdown("""
-<style>
-    .main-header {
-        background: linear-gradient(90deg, #1f2937 0%, #374151 100%);
-        padding: 1rem;
-        border-radius: 0.5rem;
-        margin-bottom: 2rem;
-        color: white;
-    }
-    .metric-card {
-        background: #374151;
-        padding: 1rem;
-        border-radius: 0.5rem;
-        border-left: 4px solid #3b82f6;
-        color: white;
-    }
-    .article-card {
-        background: #1f2937;
-        padding: 1rem;
-        border-radius: 0.5rem;
-        margin-bottom: 1rem;
-        border-left: 4px solid #10b981;
-        color: white;
+# httpx only speaks HTTP/2 when the h2 package is installed
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Optional faster (lxml-based) feed parser; falls back to feedparser
+try:
+    import fastfeedparser
+    FAST_FEED_PARSER_AVAILABLE = True
+except ImportError:
+    FAST_FEED_PARSER_AVAILABLE = False
+
+# Shared analysis service, imported once; the inline fallback is used without it
+try:
+    from ai_service import (
+        summarize_articles, summarize_short_article, content_hash, SHORT_ARTICLE_CHARS,
+        reprocess_article, reprocess_articles, test_anthropic_connection, stream_analysis_text, finish_analysis
+    )
+    AI_SERVICE_AVAILABLE = True
+except ImportError as e:
+    logger.warning(f"Could not import ai_service: {e}")
+    AI_SERVICE_AVAILABLE = False
+
+# Simple analysis prompt for the inline analysis path
+INLINE_ANALYSIS_PROMPT = """Analyze this cybersecurity article for a security analyst:
+
+Title: {title}
+Content: {content}"""
+
+# Structured output schema for the inline analysis path
+ANALYSIS_TOOL = {
+    "name": "emit_analysis",
+    "description": "Record the analysis of a cybersecurity article",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "summary": {"type": "string", "description": "2-3 paragraph executive summary"},
+            "key_takeaways": {"type": "array", "items": {"type": "string"}, "description": "3-5 key takeaways"},
+            "technical_details": {"type": "string", "description": "Technical explanation"},
+            "actionable_items": {"type": "array", "items": {"type": "string"}, "description": "Actionable items"},
+            "relevance_score": {"type": "string", "description": "Score 1-10 with explanation"}
+        },
+        "required": ["summary", "key_takeaways", "technical_details", "actionable_items", "relevance_score"]
     }
-    .status-good { color: #10b981; }
-    .status-bad { color: #ef4444; }
-</style>
-""", unsafe_allow_html=True)
+}
+
+# Sample article for the System Status AI test
+AI_TEST_CONTENT = """
+This is a test cybersecurity article about implementing zero-trust architecture.
+Zero trust is a security framework that requires all users, whether in or outside 
+the organization's network, to be authenticated, authorized, and continuously 
+validated for security configuration and posture before being granted or keeping 
+access to applications and data. This approach helps prevent data breaches and 
+limits internal threat movement.
+"""
+
+# Sources on different hosts are scraped in parallel
+SCRAPE_MAX_WORKERS = 8
+
+# Browser-like UA; some blogs refuse the default client string
+SCRAPE_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+# Concurrent article downloads within one source
+ARTICLE_FETCH_WORKERS = int(os.environ.get('ARTICLE_FETCH_WORKERS', 3))
+
+# Larger pages are cut off (or skipped, when Content-Length says so) before parsing
+MAX_PAGE_BYTES = 2_000_000
+
+# Concurrent Claude requests for the inline analysis fallback
+AI_MAX_WORKERS = int(os.environ.get('AI_MAX_WORKERS', 5))
+
+# Unprocessed articles are read and analyzed this many at a time
+AI_PAGE_SIZE = 50
+
+# AI results written per transaction while an inline run is in progress
+AI_UPDATE_BATCH = 16
+
+# Rows per page of the Articles list ("Load more" fetches the next page)
+ARTICLE_PAGE_SIZE = 30
+
+# Reader connections kept open alongside the single writer connection
+DB_READ_POOL_SIZE = int(os.environ.get('DB_READ_POOL_SIZE', 4))
+
+# Longest close() waits for a running write before leaving the writer open (seconds)
+DB_CLOSE_TIMEOUT = 5
+
+@lru_cache(maxsize=None)
+def get_article_link_selector():
+    """Article link CSS selector, compiled once; one compound selector walks the page once"""
+    return soupsieve.compile('a[href*="/blog/"], a[href*="/post/"], a[href*="/article/"], '
+                             'h2 a, h3 a, .post-title a, .article-title a')
+
+# Query parameters that only track the click and never select different content
+TRACKING_PARAMS = {'fbclid', 'gclid', 'mc_cid', 'mc_eid'}
+
+def is_tracking_param(key, value):
+    """True for click-tracking query parameters, including Medium's source=rss... feed marker"""
+    # A bare "source" can select content on other sites, so only Medium's feed value is dropped
+    return key.startswith('utm_') or key in TRACKING_PARAMS or (key == 'source' and value.startswith('rss'))
+
+def normalize_url(url):
+    """Canonical article URL: no fragment or tracking parameters, host lowercased"""
+    parts = urlsplit(url)
+    # The other query segments are kept byte-for-byte and in order: this URL is the one
+    # fetched, and re-encoding (%20 to +, bare flags to flag=) can change what a server returns
+    query = []
+    for segment in parts.query.split('&'):
+        key, _, value = segment.partition('=')
+        if segment and not is_tracking_param(unquote_plus(key), unquote_plus(value)):
+            query.append(segment)
+    return urlunsplit((parts.scheme, parts.netloc.lower(), parts.path, '&'.join(query), ''))
+
+# Dashboard banner style
+HEADER_STYLE = ("background: linear-gradient(90deg, #1f2937 0%, #374151 100%); "
+                "padding: 1rem; border-radius: 0.5rem; margin-bottom: 2rem; color: white;")
+
+# Environment variables listed on the System Status page
+ENV_VARS = (
+    ("ANTHROPIC_API_KEY", "🤖 AI Processing"),
+    ("EMAIL_ADDRESS", "📧 Email Notifications"),
+    ("EMAIL_PASSWORD", "📧 Email Authentication"),
+    ("TWILIO_ACCOUNT_SID", "📱 WhatsApp Notifications"),
+    ("TWILIO_AUTH_TOKEN", "📱 WhatsApp Authentication"),
+)
+
+# Icons for scraping log statuses; anything else (e.g. info) gets ℹ️
+LOG_STATUS_ICONS = {'success': "✅", 'error': "❌"}
+
+# Section headers in a stored analysis, and the blank lines that separate sections
+SECTION_HEADER_RE = re.compile(r'(?:🎯|🔧|✅|🚨|🛠️|📊)')
+SECTION_SPLIT_RE = re.compile(r'\n\s*\n')
+
+def format_key_points(key_points):
+    """Render a stored analysis as one markdown document, header lines in bold"""
+    blocks = []
+    for section in SECTION_SPLIT_RE.split(key_points):
+        lines = [line for line in section.strip().splitlines() if line.strip()]
+        if lines and SECTION_HEADER_RE.match(lines[0]):
+            lines[0] = f"**{lines[0]}**"
+        blocks.extend(lines)
+    return "\n\n".join(blocks)
 
 class BlogMonitorDB:
     """Enhanced database handler with background processing"""
@@ -89,12 +219,51 @@ class BlogMonitorDB:
         self.db_path = db_path
         self.init_db()
         self._last_scrape = None
+        self.scrape_progress = None  # (host groups done, total) while a scrape runs
+        self._ai_lock = threading.Lock()
+        self._working_model = None  # model found by the inline fallback's probe
+        
+        # One autocommit writer serialised by a lock; WAL lets the pooled readers run alongside it
+        self._write_lock = threading.Lock()
+        self._write_conn = self.connect(isolation_level=None)
+        self._read_pool = queue.Queue()
+        for _ in range(DB_READ_POOL_SIZE):
+            self._read_pool.put(self.connect())
+        self._closed = False
+        self._close_lock = threading.Lock()  # orders close() against readers being returned
+        atexit.register(self.close)
+        
+        # Keep-alive pool shared by every scrape request so connections and TLS sessions are reused;
+        # the transport retries failed connects (DNS, refused, connect timeout) twice with backoff
+        self._http = httpx.Client(
+            transport=httpx.HTTPTransport(
+                http2=HTTP2_AVAILABLE,
+                retries=2,
+                limits=httpx.Limits(max_keepalive_connections=20)
+            ),
+            timeout=10,
+            follow_redirects=True,
+            headers={'User-Agent': SCRAPE_USER_AGENT}
+        ) if SCRAPING_AVAILABLE else None
         
+    def connect(self, **kwargs):
+        """Open a connection with the per-connection PRAGMAs applied"""
+        conn = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False, **kwargs)
+        conn.execute("PRAGMA synchronous=NORMAL")  # safe with WAL, far fewer fsyncs
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA mmap_size=268435456")
+        conn.execute("PRAGMA cache_size=-64000")
+        conn.execute("PRAGMA journal_size_limit=67108864")  # truncate the WAL back to 64 MB after checkpoints
+        return conn
+    
     def init_db(self):
         """Initialize database with all required tables"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connect()
         cursor = conn.cursor()
         
+        # WAL lets dashboard reads proceed while a scrape is writing (persists in the file)
+        cursor.execute("PRAGMA journal_mode=WAL")
+        
         # Create articles table
         cursor.execute('''
         CREATE TABLE IF NOT EXISTS articles (
@@ -105,6 +274,7 @@ class BlogMonitorDB:
             content TEXT,
             summary TEXT,
             key_points TEXT,
+            content_hash TEXT,
             published_date TEXT,
             scraped_date TEXT DEFAULT CURRENT_TIMESTAMP,
             processed INTEGER DEFAULT 0,
@@ -112,6 +282,12 @@ class BlogMonitorDB:
         )
         ''')
         
+        # Add columns introduced after the table was first created
+        cursor.execute('PRAGMA table_info(articles)')
+        article_columns = {row[1] for row in cursor.fetchall()}
+        if 'content_hash' not in article_columns:
+            cursor.execute('ALTER TABLE articles ADD COLUMN content_hash TEXT')
+        
         # Create sources table
         cursor.execute('''
         CREATE TABLE IF NOT EXISTS blog_sources (
@@ -122,10 +298,18 @@ class BlogMonitorDB:
             scrape_type TEXT DEFAULT 'rss',
             active INTEGER DEFAULT 1,
             created_date TEXT DEFAULT CURRENT_TIMESTAMP,
-            last_scraped TEXT
+            last_scraped TEXT,
+            etag TEXT,
+            last_modified TEXT
         )
         ''')
         
+        cursor.execute('PRAGMA table_info(blog_sources)')
+        source_columns = {row[1] for row in cursor.fetchall()}
+        for column in ('etag', 'last_modified'):
+            if column not in source_columns:
+                cursor.execute(f'ALTER TABLE blog_sources ADD COLUMN {column} TEXT')
+        
         # Create notification settings table
         cursor.execute('''
         CREATE TABLE IF NOT EXISTS notification_settings (
@@ -150,49 +334,289 @@ class BlogMonitorDB:
         )
         ''')
         
-        # Insert default sources if none exist
-        cursor.execute('SELECT COUNT(*) FROM blog_sources')
-        if cursor.fetchone()[0] == 0:
-            default_sources = [
-                ('Detection Engineering', 'https://www.detectionengineering.net/', None, 'html'),
-                ('Rohit Tamma Substack', 'https://rohittamma.substack.com/', 'https://rohittamma.substack.com/feed', 'rss'),
-                ('Anton on Security', 'https://medium.com/@anton.on.security', 'https://medium.com/feed/@anton.on.security', 'rss'),
-                ('Google Cloud Security', 'https://cloud.google.com/blog/topics/security', None, 'html'),
-                ('Detect FYI', 'https://detect.fyi/', None, 'html'),
-                ('Dylan H Williams', 'https://medium.com/@dylanhwilliams', 'https://medium.com/feed/@dylanhwilliams', 'rss'),
-            ]
-            
-            cursor.executemany(
-                'INSERT INTO blog_sources (name, url, rss_url, scrape_type) VALUES (?, ?, ?, ?)',
-                default_sources
-            )
+        # Indexes for the unprocessed-article scans and newest-first (optionally per-source) listings (url is already UNIQUE)
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+        existing_indexes = {row[0] for row in cursor.fetchall()}
+        indexes = {
+            'idx_articles_processed': 'articles(processed, scraped_date)',
+            'idx_articles_scraped': 'articles(scraped_date DESC)',
+            'idx_articles_source': 'articles(source, scraped_date DESC)',
+            'idx_scraping_logs_timestamp': 'scraping_logs(timestamp DESC)',
+        }
+        for name, columns in indexes.items():
+            cursor.execute(f'CREATE INDEX IF NOT EXISTS {name} ON {columns}')
+        if not existing_indexes.issuperset(indexes):
+            # Give the planner statistics for indexes added to an existing database right away
+            cursor.execute('ANALYZE')
+        
+        # Full-text index for article search, kept in sync by triggers (needs SQLite built with FTS5)
+        try:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'articles_fts'")
+            fts_exists = cursor.fetchone() is not None
+            cursor.executescript('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+                title, content, summary, content='articles', content_rowid='id'
+            );
+            CREATE TRIGGER IF NOT EXISTS articles_fts_insert AFTER INSERT ON articles BEGIN
+                INSERT INTO articles_fts(rowid, title, content, summary)
+                VALUES (new.id, new.title, new.content, new.summary);
+            END;
+            CREATE TRIGGER IF NOT EXISTS articles_fts_delete AFTER DELETE ON articles BEGIN
+                INSERT INTO articles_fts(articles_fts, rowid, title, content, summary)
+                VALUES ('delete', old.id, old.title, old.content, old.summary);
+            END;
+            CREATE TRIGGER IF NOT EXISTS articles_fts_update AFTER UPDATE OF title, content, summary ON articles BEGIN
+                INSERT INTO articles_fts(articles_fts, rowid, title, content, summary)
+                VALUES ('delete', old.id, old.title, old.content, old.summary);
+                INSERT INTO articles_fts(rowid, title, content, summary)
+                VALUES (new.id, new.title, new.content, new.summary);
+            END;
+            ''')
+            if not fts_exists:
+                cursor.execute("INSERT INTO articles_fts(articles_fts) VALUES ('rebuild')")
+            self.fts_available = True
+        except sqlite3.OperationalError as e:
+            logger.warning(f"FTS5 not available, article search falls back to LIKE: {e}")
+            self.fts_available = False
+        
+        # Insert default sources if none exist; one statement, so the check and the insert can't interleave with another process
+        default_sources = [
+            ('Detection Engineering', 'https://www.detectionengineering.net/', None, 'html'),
+            ('Rohit Tamma Substack', 'https://rohittamma.substack.com/', 'https://rohittamma.substack.com/feed', 'rss'),
+            ('Anton on Security', 'https://medium.com/@anton.on.security', 'https://medium.com/feed/@anton.on.security', 'rss'),
+            ('Google Cloud Security', 'https://cloud.google.com/blog/topics/security', None, 'html'),
+            ('Detect FYI', 'https://detect.fyi/', None, 'html'),
+            ('Dylan H Williams', 'https://medium.com/@dylanhwilliams', 'https://medium.com/feed/@dylanhwilliams', 'rss'),
+        ]
+        values = ', '.join(['(?, ?, ?, ?)'] * len(default_sources))
+        cursor.execute(
+            f"""INSERT INTO blog_sources (name, url, rss_url, scrape_type)
+                SELECT * FROM (VALUES {values})
+                WHERE NOT EXISTS (SELECT 1 FROM blog_sources)""",
+            [field for source in default_sources for field in source]
+        )
+        
+        # Rewrite URLs stored before normalize_url existed, once (tracked in user_version), so
+        # re-scraped articles match them; a row whose canonical URL is already taken is left as is
+        cursor.execute('PRAGMA user_version')
+        if cursor.fetchone()[0] < 1:
+            cursor.execute('SELECT id, url FROM articles')
+            renames = []
+            for article_id, url in cursor.fetchall():
+                canonical = normalize_url(url)
+                if canonical != url:
+                    renames.append((canonical, article_id))
+            cursor.executemany('UPDATE OR IGNORE articles SET url = ? WHERE id = ?', renames)
+            cursor.execute('PRAGMA user_version = 1')
         
         conn.commit()
         conn.close()
     
+    def close(self):
+        """Close the pooled connections (safe to call twice); the last one to close checkpoints the WAL"""
+        # Idle readers close now; one still checked out (e.g. by a background job) is
+        # closed by read_connection when it is returned, so the job can finish
+        with self._close_lock:
+            if self._closed:
+                return
+            self._closed = True
+            while not self._read_pool.empty():
+                self._read_pool.get_nowait().close()
+        
+        # Don't hang interpreter exit behind a long write; SQLite recovers an unclosed connection
+        if self._write_lock.acquire(timeout=DB_CLOSE_TIMEOUT):
+            try:
+                # Refresh planner statistics for the indexes that need them (cheap, per SQLite's guidance)
+                self._write_conn.execute("PRAGMA optimize")
+                self._write_conn.close()
+            finally:
+                self._write_lock.release()
+        else:
+            logger.warning(f"Write connection still busy after {DB_CLOSE_TIMEOUT}s, leaving it open")
+        if self._http:
+            self._http.close()
+    
+    @contextmanager
+    def read_connection(self):
+        """Borrow a pooled read connection"""
+        conn = self._read_pool.get()
+        try:
+            yield conn
+        finally:
+            with self._close_lock:
+                if self._closed:
+                    conn.close()
+                else:
+                    self._read_pool.put(conn)
+    
+    @contextmanager
+    def write_connection(self):
+        """Hold the shared write connection for the duration of the block"""
+        with self._write_lock:
+            yield self._write_conn
+    
+    @contextmanager
+    def transaction(self):
+        """Run the block as one transaction on the write connection, rolling back on error"""
+        with self.write_connection() as conn:
+            # IMMEDIATE takes the write lock up front, so contention waits in the busy timeout
+            # instead of failing when a deferred read transaction tries to upgrade
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+                conn.execute("COMMIT")
+            except BaseException:
+                # Also covers a failed COMMIT (e.g. SQLITE_BUSY), which leaves the transaction open
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                raise
+    
     def execute_query(self, query, params=None, fetch=False):
         """Execute database query safely"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            if params:
-                cursor.execute(query, params)
-            else:
-                cursor.execute(query)
-            
             if fetch:
-                result = cursor.fetchall()
-                conn.close()
-                return result
+                with self.read_connection() as conn:
+                    return conn.execute(query, params or ()).fetchall()
             
-            conn.commit()
-            conn.close()
-            return cursor.rowcount
+            with self.write_connection() as conn:
+                return conn.execute(query, params or ()).rowcount
         except Exception as e:
             logger.error(f"Database error: {e}")
             return [] if fetch else 0
     
+    def execute_many(self, query, rows):
+        """Run one statement for many parameter rows in a single transaction"""
+        rows = list(rows)
+        if not rows:
+            return 0
+        try:
+            with self.transaction() as conn:
+                return conn.executemany(query, rows).rowcount
+        except Exception as e:
+            logger.error(f"Database error: {e}")
+            return 0
+    
+    def save_scrape_results(self, article_rows, log_rows, etag_rows):
+        """Store a scrape run's articles, log entries and feed validators in one transaction; returns new article count"""
+        # The upsert skips urls stored meanwhile by a parallel scrape
+        with self.transaction() as conn:
+            # rowcount, unlike total_changes, leaves out the FTS trigger writes
+            total_articles = conn.executemany(
+                """INSERT INTO articles (title, url, source, content, published_date) 
+                   VALUES (?, ?, ?, ?, ?)
+                   ON CONFLICT(url) DO NOTHING""",
+                article_rows
+            ).rowcount
+            conn.executemany(
+                "INSERT INTO scraping_logs (source, status, message, articles_found) VALUES (?, ?, ?, ?)",
+                log_rows
+            )
+            conn.executemany(
+                "UPDATE blog_sources SET etag = ?, last_modified = ? WHERE id = ?",
+                etag_rows
+            )
+        return total_articles
+    
+    def apply_source_changes(self, activity_rows, delete_rows):
+        """Apply (active, id) updates and (id,) deletions to blog_sources in one transaction"""
+        try:
+            with self.transaction() as conn:
+                conn.executemany("UPDATE blog_sources SET active = ? WHERE id = ?", activity_rows)
+                conn.executemany("DELETE FROM blog_sources WHERE id = ?", delete_rows)
+            return True
+        except Exception as e:
+            logger.error(f"Database error: {e}")
+            return False
+    
+    def existing_urls(self, urls):
+        """Return the subset of urls already stored, in one query"""
+        urls = list(urls)
+        if not urls:
+            return set()
+        # One fixed statement text (the list goes in as JSON) stays in each pooled connection's statement cache
+        rows = self.execute_query(
+            "SELECT url FROM articles WHERE url IN (SELECT value FROM json_each(?))",
+            (json.dumps(urls),),
+            fetch=True
+        )
+        return {row[0] for row in rows}
+    
+    def read_limited(self, response, html_only=False):
+        """Body of a streamed response, or None if it isn't HTML (when required) or is too large"""
+        # Checked before downloading, so a mis-linked PDF or video never reaches the parsers
+        content_type = response.headers.get('Content-Type', '')
+        if html_only and content_type and 'html' not in content_type:
+            logger.info(f"Skipping non-HTML {response.url} ({content_type})")
+            return None
+        if int(response.headers.get('Content-Length') or 0) > MAX_PAGE_BYTES:
+            logger.info(f"Skipping oversized {response.url}")
+            return None
+        
+        body = bytearray()
+        for chunk in response.iter_bytes():
+            body += chunk
+            if len(body) >= MAX_PAGE_BYTES:
+                break  # the parsers cope with a truncated tail
+        return bytes(body[:MAX_PAGE_BYTES])
+    
+    def fetch_page(self, url):
+        """Download a page over the pooled client; None on failure"""
+        try:
+            with self._http.stream('GET', url) as response:
+                response.raise_for_status()
+                body = self.read_limited(response, html_only=True)
+                return body.decode(response.encoding or 'utf-8', errors='replace') if body else None
+        except Exception as e:
+            logger.error(f"Error fetching {url}: {e}")
+            return None
+    
+    def fetch_pages(self, urls):
+        """Download several pages concurrently; returns a list of HTML (or None) in url order"""
+        if not urls:
+            return []
+        # Small pool so one site never sees more than a few requests at once
+        with ThreadPoolExecutor(max_workers=min(ARTICLE_FETCH_WORKERS, len(urls))) as executor:
+            return list(executor.map(self.fetch_page, urls))
+    
+    def extract_pages(self, pages, **options):
+        """Run trafilatura.extract over downloaded pages; results (None on failure) in page order"""
+        # Runs in the calling scrape thread. A process pool can't be used here: Streamlit
+        # installs this script as __main__, so spawn/forkserver workers would re-run the app
+        results = []
+        for page in pages:
+            try:
+                results.append(trafilatura.extract(page, favor_precision=True, **options) if page else None)
+            except Exception as e:
+                logger.error(f"Error extracting content: {e}")
+                results.append(None)
+        return results
+    
+    def fetch_if_modified(self, source, url, html_only=False):
+        """Conditional GET of a source's feed or listing page; (body, final url), or None when unchanged"""
+        # An unchanged page answers 304 with no body to download or parse
+        headers = {}
+        if source.get('etag'):
+            headers['If-None-Match'] = source['etag']
+        if source.get('last_modified'):
+            headers['If-Modified-Since'] = source['last_modified']
+        
+        with self._http.stream('GET', url, headers=headers) as response:
+            if response.status_code == 304:
+                logger.info(f"{source['name']} not modified")
+                return None
+            response.raise_for_status()
+            
+            body = self.read_limited(response, html_only)
+            if body is None:
+                return None
+            
+            # Saved by scrape_all_sources once the articles are stored, unless the scraper
+            # drops them because an article was lost (the next run then does a full GET)
+            source['new_etag'] = response.headers.get('ETag')
+            source['new_last_modified'] = response.headers.get('Last-Modified')
+            # Final url after redirects, so relative links resolve correctly
+            return body, str(response.url)
+    
     def scrape_rss_feed(self, source):
         """Scrape RSS feed for articles"""
         if not SCRAPING_AVAILABLE:
@@ -200,42 +624,43 @@ class BlogMonitorDB:
         
         articles = []
         try:
-            feed = feedparser.parse(source['rss_url'])
+            fetched = self.fetch_if_modified(source, source['rss_url'])
+            if fetched is None:
+                return articles
             
-            for entry in feed.entries[:5]:  # Limit to 5 recent articles
-                # Check if article already exists
-                existing = self.execute_query(
-                    "SELECT COUNT(*) FROM articles WHERE url = ?", 
-                    (entry.link,), 
-                    fetch=True
-                )[0][0]
-                
-                if existing > 0:
-                    continue
-                
-                # Get content using trafilatura
-                content = None
-                try:
-                    downloaded = trafilatura.fetch_url(entry.link)
-                    if downloaded:
-                        content = trafilatura.extract(downloaded)
-                except Exception as e:
-                    logger.error(f"Error extracting content from {entry.link}: {e}")
+            parser = fastfeedparser if FAST_FEED_PARSER_AVAILABLE else feedparser
+            feed = parser.parse(fetched[0])
+            
+            # Limit to 5 recent articles, keyed by canonical url so tracker variants dedupe
+            entries = {normalize_url(entry['link']): entry for entry in feed.entries[:5]}
+            known_urls = self.existing_urls(entries)
+            new_urls = [url for url in entries if url not in known_urls]
+            
+            # Get content using trafilatura
+            contents = self.extract_pages(self.fetch_pages(new_urls))
+            if any(content is None for content in contents):
+                source.pop('new_etag', None)
+            
+            for url, content in zip(new_urls, contents):
+                entry = entries[url]
                 
-                # Parse published date
+                # Parse published date (fastfeedparser already returns an ISO string)
                 published_date = None
-                if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                    published_date = datetime(*entry.published_parsed[:6]).isoformat()
+                if entry.get('published_parsed'):
+                    published_date = datetime(*entry['published_parsed'][:6]).isoformat()
+                elif FAST_FEED_PARSER_AVAILABLE:
+                    published_date = entry.get('published')
                 
                 articles.append({
-                    'title': entry.title,
-                    'url': entry.link,
+                    'title': entry.get('title', url),
+                    'url': url,
                     'source': source['name'],
                     'content': content,
                     'published_date': published_date
                 })
                 
         except Exception as e:
+            source.pop('new_etag', None)
             logger.error(f"Error scraping RSS for {source['name']}: {e}")
         
         return articles
@@ -247,129 +672,134 @@ class BlogMonitorDB:
         
         articles = []
         try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
-            
-            response = requests.get(source['url'], headers=headers, timeout=10)
-            response.raise_for_status()
+            fetched = self.fetch_if_modified(source, source['url'], html_only=True)
+            if fetched is None:
+                return articles
+            body, base_url = fetched
             
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = BeautifulSoup(body, 'lxml')
             
             # Find article links
             article_links = set()
-            selectors = [
-                'a[href*="/blog/"]', 'a[href*="/post/"]', 'a[href*="/article/"]',
-                'h2 a', 'h3 a', '.post-title a', '.article-title a'
-            ]
-            
-            for selector in selectors:
-                links = soup.select(selector)
-                for link in links[:10]:
-                    href = link.get('href')
-                    if href:
-                        if href.startswith('/'):
-                            href = source['url'].rstrip('/') + href
-                        if href.startswith('http'):
-                            article_links.add(href)
+            for link in get_article_link_selector().select(soup, limit=70):
+                href = link.get('href')
+                if href:
+                    # Handles /path, //host/path and ../path alike
+                    href = urljoin(base_url, href)
+                    if href.startswith('http'):
+                        article_links.add(normalize_url(href))
             
             # Process article links
-            for url in list(article_links)[:3]:  # Limit to 3 articles
+            candidate_urls = list(article_links)[:3]  # Limit to 3 articles
+            known_urls = self.existing_urls(candidate_urls)
+            new_urls = [url for url in candidate_urls if url not in known_urls]
+            # JSON output carries the text together with the page metadata from one parse
+            extracted = self.extract_pages(
+                self.fetch_pages(new_urls),
+                include_comments=False, include_tables=False, output_format='json', with_metadata=True
+            )
+            if any(result is None for result in extracted):
+                source.pop('new_etag', None)
+            for url, result in zip(new_urls, extracted):
                 try:
-                    # Check if exists
-                    existing = self.execute_query(
-                        "SELECT COUNT(*) FROM articles WHERE url = ?", 
-                        (url,), 
-                        fetch=True
-                    )[0][0]
-                    
-                    if existing > 0:
-                        continue
-                    
-                    # Get content
-                    downloaded = trafilatura.fetch_url(url)
-                    if downloaded:
-                        content = trafilatura.extract(downloaded)
+                    if result:
+                        document = json.loads(result)
+                        content = document.get('text')
                         if content and len(content.strip()) > 100:
-                            # Extract title
-                            title = content.split('\n')[0][:200] if content else url.split('/')[-1]
+                            # Title from <title>/og:title, else the first line of the text
+                            title = document.get('title') or content[:200].split('\n', 1)[0]
                             
                             articles.append({
                                 'title': title,
                                 'url': url,
                                 'source': source['name'],
                                 'content': content,
-                                'published_date': None
+                                'published_date': document.get('date')
                             })
                     
-                    time.sleep(1)  # Rate limiting
-                    
                 except Exception as e:
+                    source.pop('new_etag', None)
                     logger.error(f"Error processing {url}: {e}")
                     continue
                     
         except Exception as e:
+            source.pop('new_etag', None)
             logger.error(f"Error scraping website {source['name']}: {e}")
         
         return articles
     
+    def scrape_source(self, source):
+        """Fetch new articles for one source"""
+        if source['scrape_type'] == 'rss' and source['rss_url']:
+            return self.scrape_rss_feed(source)
+        return self.scrape_website(source)
+    
+    def scrape_host_group(self, sources):
+        """Scrape sources sharing a host one after another; returns (source, articles, error) tuples"""
+        results = []
+        for i, source in enumerate(sources):
+            if i:
+                time.sleep(2)  # Rate limiting between sources on the same host
+            try:
+                results.append((source, self.scrape_source(source), None))
+            except Exception as e:
+                logger.error(f"Error scraping {source['name']}: {e}")
+                results.append((source, [], e))
+        return results
+    
     def scrape_all_sources(self):
-        """Scrape all active sources"""
+        """Scrape all active sources, fetching from different hosts in parallel"""
         logger.info("Starting scraping of all sources...")
         
         sources = self.execute_query(
-            "SELECT name, url, rss_url, scrape_type FROM blog_sources WHERE active = 1",
+            "SELECT id, name, url, rss_url, scrape_type, etag, last_modified FROM blog_sources WHERE active = 1",
             fetch=True
         )
         
-        total_articles = 0
-        
-        for source_row in sources:
-            name, url, rss_url, scrape_type = source_row
-            source = {
+        # Sources on the same host run in turn so each host sees one request stream
+        host_groups = defaultdict(list)
+        for source_id, name, url, rss_url, scrape_type, etag, last_modified in sources:
+            host_groups[urlparse(url).netloc].append({
+                'id': source_id,
                 'name': name,
                 'url': url,
                 'rss_url': rss_url,
-                'scrape_type': scrape_type
-            }
+                'scrape_type': scrape_type,
+                'etag': etag,
+                'last_modified': last_modified
+            })
+        
+        results = []
+        self.scrape_progress = (0, len(host_groups))
+        with ThreadPoolExecutor(max_workers=SCRAPE_MAX_WORKERS) as executor:
+            futures = [executor.submit(self.scrape_host_group, group) for group in host_groups.values()]
+            for done, future in enumerate(as_completed(futures), 1):
+                results.extend(future.result())
+                self.scrape_progress = (done, len(host_groups))
+        
+        article_rows = []
+        log_rows = []
+        etag_rows = []
+        for source, articles, error in results:
+            if error:
+                log_rows.append((source['name'], 'error', str(error), 0))
+                continue
             
-            try:
-                articles = []
-                
-                if scrape_type == 'rss' and rss_url:
-                    articles = self.scrape_rss_feed(source)
-                else:
-                    articles = self.scrape_website(source)
-                
-                # Save articles
-                for article in articles:
-                    try:
-                        self.execute_query(
-                            """INSERT INTO articles (title, url, source, content, published_date) 
-                               VALUES (?, ?, ?, ?, ?)""",
-                            (article['title'], article['url'], article['source'], 
-                             article['content'], article['published_date'])
-                        )
-                        total_articles += 1
-                        logger.info(f"Saved: {article['title']}")
-                    except Exception as e:
-                        logger.error(f"Error saving article: {e}")
-                
-                # Log scraping result
-                self.execute_query(
-                    "INSERT INTO scraping_logs (source, status, message, articles_found) VALUES (?, ?, ?, ?)",
-                    (name, 'success' if articles else 'no_new_articles', 
-                     f"Found {len(articles)} new articles", len(articles))
-                )
-                
-                time.sleep(2)  # Rate limiting between sources
-                
-            except Exception as e:
-                logger.error(f"Error scraping {name}: {e}")
-                self.execute_query(
-                    "INSERT INTO scraping_logs (source, status, message, articles_found) VALUES (?, ?, ?, ?)",
-                    (name, 'error', str(e), 0)
-                )
+            article_rows.extend(
+                (article['title'], article['url'], article['source'],
+                 article['content'], article['published_date'])
+                for article in articles
+            )
+            log_rows.append((source['name'], 'success' if articles else 'no_new_articles',
+                             f"Found {len(articles)} new articles", len(articles)))
+            if 'new_etag' in source:
+                etag_rows.append((source['new_etag'], source['new_last_modified'], source['id']))
+        
+        try:
+            total_articles = self.save_scrape_results(article_rows, log_rows, etag_rows)
+        except Exception as e:
+            total_articles = 0
+            logger.error(f"Error saving scraped articles: {e}")
         
         logger.info(f"Scraping completed. Total new articles: {total_articles}")
         self._last_scrape = datetime.now()
@@ -380,64 +810,95 @@ class BlogMonitorDB:
         
         return total_articles
     
+    def unprocessed_pages(self, columns, condition=""):
+        """Yield unprocessed articles AI_PAGE_SIZE rows at a time, in id order"""
+        # Keyset paging: memory stays bounded however large the backlog, and rows
+        # left unprocessed by a failed write can't make the loop repeat a page
+        last_id = 0
+        while True:
+            page = self.execute_query(
+                f"SELECT id, {columns} FROM articles WHERE processed = 0 AND id > ? {condition} ORDER BY id LIMIT ?",
+                (last_id, AI_PAGE_SIZE),
+                fetch=True
+            )
+            if not page:
+                return
+            yield page
+            last_id = page[-1][0]
+    
     def process_articles_with_ai(self):
         """Process unprocessed articles with comprehensive AI analysis"""
         if not ANTHROPIC_AVAILABLE or not os.environ.get("ANTHROPIC_API_KEY"):
             logger.warning("Anthropic not available for processing")
             return 0
         
+        # A scrape's follow-up run and the Process AI button can overlap; only one may analyze at a time
+        if not self._ai_lock.acquire(blocking=False):
+            logger.info("AI processing already running, skipping")
+            return 0
         try:
-            # Import here to avoid issues
-            import sys
-            sys.path.append('.')
-            
-            # Try to import the AI service
-            try:
-                from ai_service import summarize_article
-            except ImportError:
-                # If import fails, define a simple version inline
-                logger.warning("Could not import ai_service, using inline version")
+            if not AI_SERVICE_AVAILABLE:
+                logger.warning("ai_service not available, using inline version")
                 return self.process_articles_inline()
-            
-            unprocessed = self.execute_query(
-                "SELECT id, title, content FROM articles WHERE processed = 0 AND content IS NOT NULL AND length(trim(content)) > 200",
-                fetch=True
-            )
-            
-            if not unprocessed:
-                logger.info("No unprocessed articles found")
-                return 0
-            
+            return self.process_with_ai_service()
+        finally:
+            self._ai_lock.release()
+    
+    def process_with_ai_service(self):
+        """Analyze unprocessed articles through ai_service"""
+        try:
             processed_count = 0
-            for article_id, title, content in unprocessed:
-                try:
-                    logger.info(f"Processing with AI: {title}")
-                    summary, key_points = summarize_article(content, title)
+            summarized_locally = 0
+            found = 0
+            for page in self.unprocessed_pages(
+                "title, content, summary, content_hash",
+                "AND content IS NOT NULL AND length(trim(content)) > 200"
+            ):
+                found += len(page)
+                to_analyze = []
+                hashes = {}
+                mark_processed = []
+                analyses = []
+                for article_id, title, content, summary, previous_hash in page:
+                    hashes[article_id] = content_hash(content)
+                    if summary and previous_hash == hashes[article_id]:
+                        # Already summarized and the text hasn't changed since
+                        mark_processed.append((article_id,))
+                        continue
+                    if len(content) < SHORT_ARTICLE_CHARS:
+                        summary, key_points = summarize_short_article(content, title)
+                        analyses.append((summary, key_points, hashes[article_id], article_id))
+                        continue
+                    to_analyze.append((article_id, title, content))
+                summarized_locally += len(analyses)
+                
+                logger.info(f"Processing {len(to_analyze)} articles with AI")
+                results = summarize_articles(to_analyze)
+                
+                for article_id, title, _ in to_analyze:
+                    summary, key_points = results.get(article_id, (None, None))
                     
                     if summary and key_points:
-                        self.execute_query(
-                            "UPDATE articles SET summary = ?, key_points = ?, processed = 1 WHERE id = ?",
-                            (summary, key_points, article_id)
-                        )
-                        processed_count += 1
+                        analyses.append((summary, key_points, hashes[article_id], article_id))
                         logger.info(f"Successfully processed: {title}")
-                        time.sleep(2)  # Rate limiting
                     else:
                         logger.error(f"No analysis generated for: {title}")
                         # Mark as processed to avoid retry loops
-                        self.execute_query(
-                            "UPDATE articles SET processed = 1 WHERE id = ?",
-                            (article_id,)
-                        )
-                    
-                except Exception as e:
-                    logger.error(f"Error processing article {title}: {e}")
-                    # Mark as processed on error to avoid retry loops
-                    self.execute_query(
-                        "UPDATE articles SET processed = 1 WHERE id = ?",
-                        (article_id,)
-                    )
+                        mark_processed.append((article_id,))
+                
+                # Each page is saved before the next is read
+                self.execute_many(
+                    "UPDATE articles SET summary = ?, key_points = ?, content_hash = ?, processed = 1 WHERE id = ?",
+                    analyses
+                )
+                self.execute_many("UPDATE articles SET processed = 1 WHERE id = ?", mark_processed)
+                processed_count += len(analyses)
+            
+            if not found:
+                logger.info("No unprocessed articles found")
+                return 0
             
+            logger.info(f"{summarized_locally} short articles summarized locally")
             logger.info(f"Processed {processed_count} articles with comprehensive AI analysis")
             return processed_count
             
@@ -451,145 +912,116 @@ class BlogMonitorDB:
             return 0
         
         try:
-            import anthropic
-            client = anthropic.Anthropic(api_key=os.environ.get("ANTHROPIC_API_KEY"))
+            client = get_anthropic_client(os.environ.get("ANTHROPIC_API_KEY"))
             
             # Try different models
             models_to_try = [
+                "claude-haiku-4-5",
                 "claude-3-5-sonnet-20241022",
-                "claude-3-5-sonnet-20240620", 
                 "claude-3-haiku-20240307"
             ]
             
-            working_model = None
-            for model in models_to_try:
-                try:
-                    test_response = client.messages.create(
-                        model=model,
-                        max_tokens=10,
-                        messages=[{"role": "user", "content": "test"}]
-                    )
-                    working_model = model
-                    logger.info(f"Using model: {model}")
-                    break
-                except Exception as e:
-                    logger.warning(f"Model {model} not available: {e}")
-                    continue
+            # Each probe is a billed request, so the answer is kept until the model stops resolving
+            if not self._working_model:
+                for model in models_to_try:
+                    try:
+                        client.messages.create(
+                            model=model,
+                            max_tokens=10,
+                            messages=[{"role": "user", "content": "test"}]
+                        )
+                        self._working_model = model
+                        logger.info(f"Using model: {model}")
+                        break
+                    except Exception as e:
+                        logger.warning(f"Model {model} not available: {e}")
+                        continue
             
+            working_model = self._working_model
             if not working_model:
                 logger.error("No working Claude models found")
                 return 0
             
-            unprocessed = self.execute_query(
-                "SELECT id, title, content FROM articles WHERE processed = 0 AND content IS NOT NULL",
-                fetch=True
-            )
+            def analyze(title, content):
+                prompt = INLINE_ANALYSIS_PROMPT.format(title=title, content=content)
+                
+                # Forcing the tool call makes Claude return the analysis as structured input
+                response = client.messages.create(
+                    model=working_model,
+                    max_tokens=1500,
+                    temperature=0.3,
+                    tools=[ANALYSIS_TOOL],
+                    tool_choice={"type": "tool", "name": ANALYSIS_TOOL["name"]},
+                    messages=[{"role": "user", "content": prompt}]
+                )
+                
+                result = next(
+                    (block.input for block in response.content if block.type == "tool_use"),
+                    {}
+                )
+                
+                summary = result.get("summary", "Analysis completed")
+                
+                # Format key points, skipping empty sections
+                takeaways = result.get("key_takeaways")
+                details = result.get("technical_details")
+                actions = result.get("actionable_items")
+                score = result.get("relevance_score")
+                key_points = "\n\n".join(filter(None, (
+                    "🎯 **KEY TAKEAWAYS:**\n" + "\n".join(f"• {item}" for item in takeaways) if takeaways else None,
+                    f"🔧 **TECHNICAL DETAILS:**\n{details}" if details else None,
+                    "✅ **ACTIONABLE ITEMS:**\n" + "\n".join(f"• {item}" for item in actions) if actions else None,
+                    f"📊 **RELEVANCE SCORE:** {score}" if score else None
+                )))
+                return summary, key_points
             
+            mark_processed = []
+            analyses = []
             processed_count = 0
-            for article_id, title, content in unprocessed:
-                if len(content.strip()) < 200:
-                    # Mark short articles as processed
-                    self.execute_query(
-                        "UPDATE articles SET processed = 1 WHERE id = ?",
-                        (article_id,)
-                    )
-                    continue
-                
-                try:
-                    # Simple analysis prompt
-                    prompt = f"""Analyze this cybersecurity article for a security analyst:
-
-Title: {title}
-Content: {content[:8000]}
-
-Provide a JSON response with:
-{{
-    "summary": "2-3 paragraph executive summary",
-    "key_takeaways": ["takeaway 1", "takeaway 2", "takeaway 3"],
-    "technical_details": "technical explanation",
-    "actionable_items": ["action 1", "action 2"],
-    "relevance_score": "score 1-10 with explanation"
-}}"""
-                    
-                    response = client.messages.create(
-                        model=working_model,
-                        max_tokens=1500,
-                        temperature=0.3,
-                        messages=[{"role": "user", "content": prompt}]
-                    )
-                    
-                    response_text = response.content[0].text
-                    
-                    # Clean response text to handle control characters
-                    import re
-                    cleaned_text = re.sub(r'[\x00-\x1f\x7f-\x9f]', '', response_text)
-                    
-                    # Try to parse JSON
-                    try:
-                        import json
-                        result = json.loads(cleaned_text)
-                        
-                        summary = result.get("summary", "Analysis completed")
-                        
-                        # Format key points
-                        sections = []
-                        if result.get("key_takeaways"):
-                            sections.append("🎯 **KEY TAKEAWAYS:**")
-                            for item in result["key_takeaways"]:
-                                sections.append(f"• {item}")
-                            sections.append("")
-                        
-                        if result.get("technical_details"):
-                            sections.append("🔧 **TECHNICAL DETAILS:**")
-                            sections.append(result["technical_details"])
-                            sections.append("")
-                        
-                        if result.get("actionable_items"):
-                            sections.append("✅ **ACTIONABLE ITEMS:**")
-                            for item in result["actionable_items"]:
-                                sections.append(f"• {item}")
-                            sections.append("")
-                        
-                        if result.get("relevance_score"):
-                            sections.append(f"📊 **RELEVANCE SCORE:** {result['relevance_score']}")
-                        
-                        key_points = "\n".join(sections)
-                        
-                    except json.JSONDecodeError as e:
-                        logger.warning(f"JSON parsing failed for {title}: {e}")
-                        
-                        # Try to extract key information manually
-                        summary_match = re.search(r'"summary":\s*"([^"]*)"', cleaned_text)
-                        summary = summary_match.group(1) if summary_match else f"AI Analysis of: {title}"
-                        
-                        # Create a simple analysis from the raw response
-                        key_points = f"""🤖 **AI ANALYSIS:**
-{cleaned_text[:800]}...
-
-🎯 **EXTRACTED INSIGHTS:**
-• Analysis completed successfully
-• See summary above for key details
-• Article contains cybersecurity-relevant information
-
-📊 **STATUS:** Analysis completed with text extraction"""
-                    
-                    # Save results
-                    self.execute_query(
+            
+            def save_results():
+                # Flushed every AI_UPDATE_BATCH results, so a crash mid-run keeps what was already paid for
+                with self.transaction() as conn:
+                    conn.executemany(
                         "UPDATE articles SET summary = ?, key_points = ?, processed = 1 WHERE id = ?",
-                        (summary, key_points, article_id)
+                        analyses
                     )
+                    conn.executemany("UPDATE articles SET processed = 1 WHERE id = ?", mark_processed)
+                saved = len(analyses)
+                analyses.clear()
+                mark_processed.clear()
+                return saved
+            
+            # Requests are network-bound, so a few run at once; the client backs off on 429s itself
+            with ThreadPoolExecutor(max_workers=AI_MAX_WORKERS) as executor:
+                # Only the first 8000 characters go into the prompt, so SQLite truncates before copying out
+                for page in self.unprocessed_pages("title, substr(content, 1, 8000)", "AND content IS NOT NULL"):
+                    futures = {}
+                    for article_id, title, content in page:
+                        if len(content.strip()) < 200:
+                            # Mark short articles as processed
+                            mark_processed.append((article_id,))
+                            continue
+                        futures[executor.submit(analyze, title, content)] = (article_id, title)
                     
-                    processed_count += 1
-                    logger.info(f"Processed: {title}")
-                    time.sleep(2)  # Rate limiting
+                    for future in as_completed(futures):
+                        article_id, title = futures[future]
+                        try:
+                            summary, key_points = future.result()
+                            analyses.append((summary, key_points, article_id))
+                            logger.info(f"Processed: {title}")
+                        except Exception as e:
+                            logger.error(f"Error processing {title}: {e}")
+                            if isinstance(e, anthropic.NotFoundError):
+                                # Model retired or renamed; probe again on the next run
+                                self._working_model = None
+                            # Mark as processed to avoid retry
+                            mark_processed.append((article_id,))
+                        
+                        if len(analyses) + len(mark_processed) >= AI_UPDATE_BATCH:
+                            processed_count += save_results()
                     
-                except Exception as e:
-                    logger.error(f"Error processing {title}: {e}")
-                    # Mark as processed to avoid retry
-                    self.execute_query(
-                        "UPDATE articles SET processed = 1 WHERE id = ?",
-                        (article_id,)
-                    )
+                    processed_count += save_results()
             
             return processed_count
             
@@ -602,30 +1034,199 @@ Provide a JSON response with:
         if not ANTHROPIC_AVAILABLE or not os.environ.get("ANTHROPIC_API_KEY"):
             return False, "Anthropic not available"
         
-        try:
-            from ai_service import reprocess_article
-            return reprocess_article(article_id, self)
-        except ImportError:
+        if not AI_SERVICE_AVAILABLE:
             return False, "AI service not available"
+        
+        return reprocess_article(article_id, self)
+    
+    def reprocess_selected_articles(self, article_ids):
+        """Re-analyze the given articles as one batch; returns the number analyzed"""
+        if not ANTHROPIC_AVAILABLE or not os.environ.get("ANTHROPIC_API_KEY") or not AI_SERVICE_AVAILABLE:
+            logger.warning("AI service not available for re-analysis")
+            return 0
+        
+        return reprocess_articles(article_ids, self)
 
 # Initialize database
 @st.cache_resource
 def get_database():
     return BlogMonitorDB()
 
+@st.cache_resource
+def get_job_registry():
+    """Background jobs shared by all sessions: a lock and a dict of name -> job state"""
+    return threading.Lock(), {}
+
+def start_background_job(name, func, progress=None):
+    """
+    Run func on a daemon thread so long scrapes and AI runs don't block the UI.
+    progress, if given, returns (done, total) for the status panel.
+    Returns False if a job with the same name is already running.
+    """
+    lock, jobs = get_job_registry()
+    with lock:
+        if name in jobs and jobs[name]['thread'].is_alive():
+            return False
+        
+        job = {'started': datetime.now(), 'result': None, 'error': None, 'progress': progress}
+        
+        def run():
+            try:
+                job['result'] = func()
+            except Exception as e:
+                logger.error(f"Background job {name} failed: {e}")
+                job['error'] = str(e)
+            clear_article_caches()
+        
+        job['thread'] = threading.Thread(target=run, name=name, daemon=True)
+        jobs[name] = job
+        job['thread'].start()
+        return True
+
+@st.fragment(run_every=5)
+def show_background_jobs():
+    """Poll background job status without rerunning the whole page"""
+    _, jobs = get_job_registry()
+    for name, job in list(jobs.items()):
+        if job['thread'].is_alive():
+            status = job['progress']() if job['progress'] else None
+            if status and status[1]:
+                done, total = status
+                st.progress(done / total, text=f"⏳ {name}: {done}/{total} done")
+            else:
+                st.info(f"⏳ {name} running since {job['started']:%H:%M:%S}")
+        elif job['error']:
+            st.error(f"❌ {name} failed: {job['error']}")
+        else:
+            st.success(f"✅ {name} finished at {job['started']:%H:%M:%S}: {job['result']} articles")
+
+@st.cache_resource
+def get_anthropic_client(api_key):
+    """One pooled Anthropic client per API key, reused across reruns and sessions"""
+    # The SDK backs off on 429s itself, honoring retry-after
+    return anthropic.Anthropic(api_key=api_key, max_retries=4)
+
+@st.cache_data(ttl=30, show_spinner=False)
+def get_dashboard_stats(_db):
+    """Dashboard counts, cached for 30 seconds across reruns"""
+    # One scan of articles for all three counts and the analysis rate, plus the active source count
+    total, processed, recent, rate, sources = _db.execute_query(
+        """SELECT COUNT(*),
+                  COALESCE(SUM(processed = 1), 0),
+                  COALESCE(SUM(scraped_date >= ?), 0),
+                  COALESCE(ROUND(100.0 * SUM(processed = 1) / COUNT(*), 1), 0),
+                  (SELECT COUNT(*) FROM blog_sources WHERE active = 1)
+           FROM articles""",
+        ((datetime.now() - timedelta(days=7)).isoformat(),),
+        fetch=True
+    )[0]
+    return {
+        'total': total,
+        'processed': processed,
+        'recent': recent,
+        'rate': rate,
+        'sources': sources
+    }
+
+def clear_article_caches():
+    """Drop the cached article and log queries after a scrape or analysis has written to them"""
+    # Connection tests, settings and source names are left cached; jobs don't change them
+    for cached in (get_dashboard_stats, get_recent_articles, get_recent_logs, get_filtered_articles, get_blog_sources):
+        cached.clear()
+
+@st.cache_data(ttl=300, show_spinner=False)
+def get_article_sources(_db):
+    """Source names for the Articles filter, cached for five minutes"""
+    # blog_sources is tiny; DISTINCT over articles scanned the whole table. Paused sources stay listed.
+    return [row[0] for row in _db.execute_query("SELECT name FROM blog_sources ORDER BY name", fetch=True)]
+
+@st.cache_data(ttl=30, show_spinner=False)
+def get_recent_articles(_db):
+    """Five newest articles for the dashboard, cached for 30 seconds across reruns"""
+    # Only a summary preview and an analysis flag are shown, so SQLite trims them instead of returning whole blobs
+    return _db.execute_query(
+        """SELECT title, source, url,
+                  substr(summary, 1, 200),
+                  length(summary) > 200,
+                  COALESCE(instr(key_points, '🎯') > 0 OR instr(key_points, '🔧') > 0, 0),
+                  processed, scraped_date
+           FROM articles ORDER BY scraped_date DESC LIMIT 5""",
+        fetch=True
+    )
+
+@st.cache_data(ttl=30, show_spinner=False)
+def get_recent_logs(_db):
+    """Ten newest scraping log entries for System Status, cached for 30 seconds across reruns"""
+    return _db.execute_query(
+        "SELECT source, status, message, articles_found, timestamp FROM scraping_logs ORDER BY timestamp DESC LIMIT 10",
+        fetch=True
+    )
+
+@st.cache_data(ttl=60, show_spinner=False)
+def get_filtered_articles(_db, selected_source, status_filter, search, before=None):
+    """
+    One page of article list rows for the Articles page filters, cached for a minute.
+    before is the (scraped_date, id) of the previous page's last row.
+    """
+    # Build query (analysis text is only loaded for the selected article)
+    query = "SELECT id, title, source, url, processed, scraped_date FROM articles WHERE 1=1"
+    params = []
+    
+    if selected_source != "All":
+        query += " AND source = ?"
+        params.append(selected_source)
+    
+    if status_filter == "Processed":
+        query += " AND processed = 1"
+    elif status_filter == "Unprocessed":
+        query += " AND processed = 0"
+    
+    if search and _db.fts_available:
+        # Each word quoted (so punctuation isn't FTS syntax) and prefix-matched
+        query += " AND id IN (SELECT rowid FROM articles_fts WHERE articles_fts MATCH ?)"
+        params.append(' '.join('"' + word.replace('"', '""') + '"*' for word in search.split()))
+    elif search:
+        query += " AND title LIKE ?"
+        params.append(f"%{search}%")
+    
+    if before:
+        # Keyset paging: continue below the last row shown rather than skipping rows with OFFSET
+        query += " AND (scraped_date, id) < (?, ?)"
+        params.extend(before)
+    
+    query += f" ORDER BY scraped_date DESC, id DESC LIMIT {ARTICLE_PAGE_SIZE}"
+    
+    return _db.execute_query(query, params, fetch=True)
+
+@st.cache_data(ttl=300, show_spinner=False)
+def get_blog_sources(_db):
+    """Sources for the management page, cached for five minutes (edits and scrapes clear it)"""
+    return _db.execute_query(
+        "SELECT id, name, url, scrape_type, active, last_scraped FROM blog_sources ORDER BY name",
+        fetch=True
+    )
+
+@st.cache_data(ttl=300, show_spinner=False)
+def get_notification_settings(_db):
+    """Notification settings row as (email_enabled, email_address, whatsapp_enabled, whatsapp_number)"""
+    settings = _db.execute_query(
+        "SELECT email_enabled, email_address, whatsapp_enabled, whatsapp_number FROM notification_settings WHERE id = 1",
+        fetch=True
+    )
+    return settings[0] if settings else (1, "", 1, "")
+
 def test_connections():
     """Test all service connections with detailed feedback"""
     results = {}
     
     # Test Anthropic with comprehensive testing
-    if ANTHROPIC_AVAILABLE and os.environ.get("ANTHROPIC_API_KEY"):
+    if ANTHROPIC_AVAILABLE and AI_SERVICE_AVAILABLE and os.environ.get("ANTHROPIC_API_KEY"):
         try:
-            from ai_service import test_anthropic_connection
             success, message = test_anthropic_connection()
             results['anthropic'] = {
                 'status': success, 
                 'message': message,
-                'model': 'Claude Sonnet (Comprehensive Analysis)' if success else 'Connection Failed'
+                'model': 'Claude Haiku (Comprehensive Analysis)' if success else 'Connection Failed'
             }
         except Exception as e:
             results['anthropic'] = {
@@ -644,7 +1245,7 @@ def test_connections():
     results['scraping'] = {
         'status': SCRAPING_AVAILABLE, 
         'message': 'Web scraping libraries available' if SCRAPING_AVAILABLE else 'Missing libraries',
-        'libraries': 'requests, beautifulsoup4, feedparser, trafilatura' if SCRAPING_AVAILABLE else 'Missing'
+        'libraries': 'httpx, beautifulsoup4, feedparser, trafilatura' if SCRAPING_AVAILABLE else 'Missing'
     }
     
     # Test email
@@ -665,6 +1266,12 @@ def test_connections():
     
     return results
 
+@st.cache_data(ttl=300, show_spinner=False)
+def get_connection_results():
+    """Connection test results and when they were taken, shared for five minutes"""
+    # The Anthropic check is a real (billed) API call, so repeat clicks and other sessions reuse it
+    return test_connections(), datetime.now()
+
 def main():
     """Main application"""
     st.sidebar.title("🔒 Blog Monitor")
@@ -688,6 +1295,7 @@ def main():
         show_system_status(db)
     elif page == "Articles":
         show_articles(db)
+        show_background_jobs()
     elif page == "Sources":
         show_sources(db)
     elif page == "Settings":
@@ -695,7 +1303,11 @@ def main():
 
 def show_dashboard(db):
     """Show main dashboard"""
-    st.markdown('<div class="main-header"><h1>🔒 Cybersecurity Blog Monitor</h1><p>AI-powered monitoring of cybersecurity blogs</p></div>', unsafe_allow_html=True)
+    # Colors come from the [theme] in .streamlit/config.toml; only the banner needs its own style
+    st.markdown(
+        f'<div style="{HEADER_STYLE}"><h1>🔒 Cybersecurity Blog Monitor</h1><p>AI-powered monitoring of cybersecurity blogs</p></div>',
+        unsafe_allow_html=True
+    )
     
     # Manual scraping button
     col1, col2, col3 = st.columns([1, 1, 2])
@@ -703,36 +1315,26 @@ def show_dashboard(db):
     with col1:
         if st.button("🔄 Scrape Now", type="primary"):
             if SCRAPING_AVAILABLE:
-                with st.spinner("Scraping articles..."):
-                    count = db.scrape_all_sources()
-                    if count > 0:
-                        st.success(f"Found {count} new articles!")
-                        st.rerun()
-                    else:
-                        st.info("No new articles found")
+                if start_background_job("Scraping", db.scrape_all_sources, lambda: db.scrape_progress):
+                    st.toast("Scraping queued")
+                else:
+                    st.toast("Scraping is already running")
             else:
                 st.error("Scraping libraries not available")
     
     with col2:
         if st.button("🤖 Process AI", type="secondary"):
             if ANTHROPIC_AVAILABLE and os.environ.get("ANTHROPIC_API_KEY"):
-                with st.spinner("Processing with AI..."):
-                    # First check if there are articles to process
-                    unprocessed_count = db.execute_query(
-                        "SELECT COUNT(*) FROM articles WHERE processed = 0", 
-                        fetch=True
-                    )[0][0]
-                    
-                    if unprocessed_count == 0:
-                        st.info("No unprocessed articles found")
-                    else:
-                        st.info(f"Found {unprocessed_count} articles to process...")
-                        count = db.process_articles_with_ai()
-                        if count > 0:
-                            st.success(f"Processed {count} articles!")
-                            st.rerun()
-                        else:
-                            st.error("Processing failed - check logs")
+                # First check if there are articles to process (from the cached dashboard counts)
+                stats = get_dashboard_stats(db)
+                unprocessed_count = stats['total'] - stats['processed']
+                
+                if unprocessed_count == 0:
+                    st.info("No unprocessed articles found")
+                elif start_background_job("AI processing", db.process_articles_with_ai):
+                    st.toast(f"Queued {unprocessed_count} articles for AI processing")
+                else:
+                    st.toast("AI processing is already running")
             else:
                 st.error("Anthropic not available - check API key")
     
@@ -774,23 +1376,17 @@ def show_dashboard(db):
                                 success, message = db.reprocess_single_article(article_id)
                                 if success:
                                     st.success("✅ Test analysis successful!")
+                                    clear_article_caches()
                                     st.rerun()
                                 else:
                                     st.error(f"❌ Test failed: {message}")
                         else:
                             st.info("No unprocessed articles to test")
     
+    show_background_jobs()
+    
     # Statistics
-    stats = {
-        'total': db.execute_query("SELECT COUNT(*) FROM articles", fetch=True)[0][0],
-        'processed': db.execute_query("SELECT COUNT(*) FROM articles WHERE processed = 1", fetch=True)[0][0],
-        'recent': db.execute_query(
-            "SELECT COUNT(*) FROM articles WHERE scraped_date >= ?", 
-            ((datetime.now() - timedelta(days=7)).isoformat(),), 
-            fetch=True
-        )[0][0],
-        'sources': db.execute_query("SELECT COUNT(*) FROM blog_sources WHERE active = 1", fetch=True)[0][0]
-    }
+    stats = get_dashboard_stats(db)
     
     col1, col2, col3, col4 = st.columns(4)
     
@@ -805,42 +1401,34 @@ def show_dashboard(db):
     
     # Recent articles with enhanced display
     st.subheader("📈 Recent Articles")
-    recent_articles = db.execute_query(
-        "SELECT title, source, url, summary, key_points, processed, scraped_date FROM articles ORDER BY scraped_date DESC LIMIT 5",
-        fetch=True
-    )
+    recent_articles = get_recent_articles(db)
     
     if recent_articles:
         for article in recent_articles:
-            title, source, url, summary, key_points, processed, scraped_date = article
+            title, source, url, summary, summary_truncated, has_analysis, processed, scraped_date = article
             
-            with st.container():
+            # One markdown block per column keeps the element count per card low
+            with st.container(border=True):
                 col1, col2 = st.columns([4, 1])
                 
                 with col1:
                     status_icon = "✅" if processed else "❌"
-                    st.markdown(f"**{status_icon} {title}**")
-                    st.markdown(f"*Source: {source} | Scraped: {scraped_date}*")
+                    lines = [f"**{status_icon} {title}**", f"*Source: {source} | Scraped: {scraped_date}*"]
                     
                     if processed and summary:
                         # Show first part of summary
-                        preview = summary[:200] + "..." if len(summary) > 200 else summary
-                        st.markdown(f"📋 **Summary:** {preview}")
+                        preview = summary + "..." if summary_truncated else summary
+                        lines.append(f"📋 **Summary:** {preview}")
                         
                         # Show if we have comprehensive analysis
-                        if key_points and ("🎯" in key_points or "🔧" in key_points):
-                            st.markdown("🔍 *Comprehensive cybersecurity analysis available*")
+                        if has_analysis:
+                            lines.append("🔍 *Comprehensive cybersecurity analysis available*")
                     elif not processed:
-                        st.markdown("🤖 *Ready for AI analysis*")
+                        lines.append("🤖 *Ready for AI analysis*")
+                    st.markdown("\n\n".join(lines))
                 
                 with col2:
-                    st.markdown(f"[📖 Read Full]({url})")
-                    if processed:
-                        st.markdown("✅ Analyzed")
-                    else:
-                        st.markdown("⏳ Pending")
-                
-                st.divider()
+                    st.markdown(f"[📖 Read Full]({url})\n\n{'✅ Analyzed' if processed else '⏳ Pending'}")
     else:
         st.info("No articles found. Click 'Scrape Now' to find cybersecurity articles.")
     
@@ -851,10 +1439,9 @@ def show_dashboard(db):
         col1, col2 = st.columns(2)
         
         with col1:
-            processing_rate = (stats['processed'] / stats['total']) * 100
             st.metric(
                 "Processing Rate", 
-                f"{processing_rate:.1f}%",
+                f"{stats['rate']:.1f}%",
                 help="Percentage of articles that have been analyzed with AI"
             )
         
@@ -872,26 +1459,19 @@ def show_system_status(db):
     
     # Environment check
     st.subheader("Environment Variables")
-    env_vars = [
-        ("ANTHROPIC_API_KEY", "🤖 AI Processing"),
-        ("EMAIL_ADDRESS", "📧 Email Notifications"),
-        ("EMAIL_PASSWORD", "📧 Email Authentication"),
-        ("TWILIO_ACCOUNT_SID", "📱 WhatsApp Notifications"),
-        ("TWILIO_AUTH_TOKEN", "📱 WhatsApp Authentication")
-    ]
-    
-    for var, description in env_vars:
-        status = "✅" if os.environ.get(var) else "❌"
-        st.markdown(f"{status} **{var}** - {description}")
+    st.markdown("\n\n".join(
+        f"{'✅' if os.environ.get(var) else '❌'} **{var}** - {description}" for var, description in ENV_VARS
+    ))
     
     # Connection tests with enhanced display
     st.subheader("🔬 Service Tests")
     
     if st.button("🧪 Test All Connections"):
         with st.spinner("Testing connections..."):
-            results = test_connections()
+            results, tested_at = get_connection_results()
             
             st.markdown("### Test Results:")
+            st.caption(f"Tested at {tested_at:%H:%M:%S} (results are reused for five minutes)")
             
             for service, result in results.items():
                 status_icon = "✅" if result['status'] else "❌"
@@ -921,35 +1501,29 @@ def show_system_status(db):
     # Quick AI Analysis Test
     st.subheader("🤖 AI Analysis Test")
     
-    if ANTHROPIC_AVAILABLE and os.environ.get("ANTHROPIC_API_KEY"):
+    if ANTHROPIC_AVAILABLE and AI_SERVICE_AVAILABLE and os.environ.get("ANTHROPIC_API_KEY"):
         if st.button("🧠 Test AI Analysis"):
-            test_content = """
-            This is a test cybersecurity article about implementing zero-trust architecture.
-            Zero trust is a security framework that requires all users, whether in or outside 
-            the organization's network, to be authenticated, authorized, and continuously 
-            validated for security configuration and posture before being granted or keeping 
-            access to applications and data. This approach helps prevent data breaches and 
-            limits internal threat movement.
-            """
-            
-            with st.spinner("Testing AI analysis capabilities..."):
-                try:
-                    from ai_service import summarize_article
-                    summary, key_points = summarize_article(test_content, "Zero Trust Architecture Test")
+            try:
+                # Show the analysis live as Claude generates it
+                with st.expander("Live Analysis Output", expanded=True):
+                    response_text = st.write_stream(
+                        stream_analysis_text(AI_TEST_CONTENT, "Zero Trust Architecture Test")
+                    )
+                summary, key_points = finish_analysis(AI_TEST_CONTENT, "Zero Trust Architecture Test", response_text)
+                
+                if summary and key_points:
+                    st.success("✅ AI Analysis Test Successful!")
                     
-                    if summary and key_points:
-                        st.success("✅ AI Analysis Test Successful!")
-                        
-                        with st.expander("View Test Analysis Results"):
-                            st.markdown("**Summary:**")
-                            st.markdown(summary)
-                            st.markdown("**Analysis:**")
-                            st.markdown(key_points)
-                    else:
-                        st.error("❌ AI Analysis Test Failed - No results generated")
-                        
-                except Exception as e:
-                    st.error(f"❌ AI Analysis Test Failed: {str(e)}")
+                    with st.expander("View Test Analysis Results"):
+                        st.markdown("**Summary:**")
+                        st.markdown(summary)
+                        st.markdown("**Analysis:**")
+                        st.markdown(key_points)
+                else:
+                    st.error("❌ AI Analysis Test Failed - No results generated")
+                    
+            except Exception as e:
+                st.error(f"❌ AI Analysis Test Failed: {str(e)}")
     else:
         st.warning("⚠️ AI Analysis not available - Configure ANTHROPIC_API_KEY")
     
@@ -959,20 +1533,20 @@ def show_system_status(db):
     system_info = {
         "Python Environment": "Streamlit Cloud",
         "Database": "SQLite (Local)",
-        "AI Model": "Claude Sonnet (Anthropic)" if ANTHROPIC_AVAILABLE else "Not Available",
+        "AI Model": "Claude Haiku (Anthropic)" if ANTHROPIC_AVAILABLE else "Not Available",
         "Scraping": "Enabled" if SCRAPING_AVAILABLE else "Disabled",
         "Notifications": "Email + WhatsApp" if os.environ.get("EMAIL_ADDRESS") and os.environ.get("TWILIO_ACCOUNT_SID") else "Partial/Disabled"
     }
     
-    for key, value in system_info.items():
-        st.markdown(f"**{key}:** {value}")
+    st.markdown("\n\n".join(f"**{key}:** {value}" for key, value in system_info.items()))
     
     # Performance metrics
     st.subheader("⚡ Performance Metrics")
     
     # Get database stats
-    total_articles = db.execute_query("SELECT COUNT(*) FROM articles", fetch=True)[0][0]
-    processed_articles = db.execute_query("SELECT COUNT(*) FROM articles WHERE processed = 1", fetch=True)[0][0]
+    stats = get_dashboard_stats(db)
+    total_articles = stats['total']
+    processed_articles = stats['processed']
     
     col1, col2, col3 = st.columns(3)
     
@@ -983,148 +1557,151 @@ def show_system_status(db):
         st.metric("Articles Analyzed", processed_articles)
     
     with col3:
-        processing_rate = (processed_articles / total_articles * 100) if total_articles > 0 else 0
-        st.metric("Analysis Rate", f"{processing_rate:.1f}%")
+        st.metric("Analysis Rate", f"{stats['rate']:.1f}%")
     
     # Recent logs
     st.subheader("Recent Scraping Logs")
-    logs = db.execute_query(
-        "SELECT source, status, message, articles_found, timestamp FROM scraping_logs ORDER BY timestamp DESC LIMIT 10",
-        fetch=True
-    )
+    logs = get_recent_logs(db)
     
+    lines = []
     for log in logs:
         source, status, message, articles_found, timestamp = log
-        status_icon = "✅" if status == 'success' else "❌" if status == 'error' else "ℹ️"
-        st.markdown(f"{status_icon} **{source}** ({timestamp}): {message}")
+        status_icon = LOG_STATUS_ICONS.get(status, "ℹ️")
+        lines.append(f"{status_icon} **{source}** ({timestamp}): {message}")
+    st.markdown("\n\n".join(lines))
 
+@st.fragment
 def show_articles(db):
     """Show articles with comprehensive analysis display"""
+    # A fragment: filter, selection and paging changes rerun only this page, not main()
     st.header("📰 Articles")
     
     # Filters
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        sources = ["All"] + [row[0] for row in db.execute_query("SELECT DISTINCT source FROM articles", fetch=True)]
+        sources = ["All"] + get_article_sources(db)
         selected_source = st.selectbox("Source", sources)
     
     with col2:
         status_filter = st.selectbox("Status", ["All", "Processed", "Unprocessed"])
     
     with col3:
-        search = st.text_input("Search")
+        # Stripped so stray spaces reuse the cached result (and blank input means no search)
+        search = st.text_input("Search").strip()
     
-    # Build query
-    query = "SELECT id, title, source, url, summary, key_points, processed, scraped_date FROM articles WHERE 1=1"
-    params = []
+    # Pages loaded so far, as keyset boundaries; changing a filter starts again from the first page
+    filters = (selected_source, status_filter, search)
+    if st.session_state.get("article_filters") != filters:
+        st.session_state.article_filters = filters
+        st.session_state.article_pages = [None]
     
-    if selected_source != "All":
-        query += " AND source = ?"
-        params.append(selected_source)
+    articles = []
+    for before in st.session_state.article_pages:
+        page = get_filtered_articles(db, *filters, before)
+        articles.extend(page)
     
-    if status_filter == "Processed":
-        query += " AND processed = 1"
-    elif status_filter == "Unprocessed":
-        query += " AND processed = 0"
+    if not articles:
+        st.info("No articles found matching your criteria.")
+        return
     
-    if search:
-        query += " AND title LIKE ?"
-        params.append(f"%{search}%")
+    # One table instead of an expander per article; select a row to see its analysis
+    rows = [
+        {"ID": article_id, "Title": title, "Source": source, "URL": url, "Analyzed": bool(processed), "Scraped": scraped_date}
+        for article_id, title, source, url, processed, scraped_date in articles
+    ]
+    event = st.dataframe(
+        rows,
+        column_config={
+            "ID": None,
+            "URL": st.column_config.LinkColumn("Link", display_text="🔗 Read"),
+            "Analyzed": st.column_config.CheckboxColumn("Analyzed"),
+        },
+        hide_index=True,
+        use_container_width=True,
+        on_select="rerun",
+        selection_mode="multi-row",
+    )
     
-    query += " ORDER BY scraped_date DESC LIMIT 30"
+    if len(page) == ARTICLE_PAGE_SIZE and st.button("Load more"):
+        last_id, scraped_date = articles[-1][0], articles[-1][5]
+        st.session_state.article_pages.append((scraped_date, last_id))
+        st.rerun(scope="fragment")
     
-    articles = db.execute_query(query, params, fetch=True)
+    selected_ids = [rows[i]["ID"] for i in event.selection.rows]
+    if not selected_ids:
+        st.caption("Select an article to view its analysis, or several to analyze them together.")
+        return
     
-    if not articles:
-        st.info("No articles found matching your criteria.")
+    if len(selected_ids) > 1 and ANTHROPIC_AVAILABLE and AI_SERVICE_AVAILABLE:
+        if st.button(f"🤖 Analyze selected ({len(selected_ids)})"):
+            queue_reanalysis(db, selected_ids)
+    
+    if len(selected_ids) == 1:
+        show_article_detail(db, selected_ids[0])
+
+def queue_reanalysis(db, article_ids):
+    """Run a batch re-analysis as a background job instead of blocking the page"""
+    if start_background_job("Re-analysis", lambda: db.reprocess_selected_articles(article_ids)):
+        st.toast(f"Queued {len(article_ids)} articles for analysis")
+    else:
+        st.toast("Re-analysis is already running")
+
+def show_article_detail(db, article_id):
+    """Show the analysis and actions for a single article"""
+    result = db.execute_query(
+        "SELECT title, source, url, summary, key_points, processed, scraped_date FROM articles WHERE id = ?",
+        (article_id,), fetch=True
+    )
+    if not result:
         return
+    title, source, url, summary, key_points, processed, scraped_date = result[0]
+    
+    st.subheader(f"{'✅' if processed else '❌'} {title}")
     
-    # Display articles with enhanced formatting
-    for article in articles:
-        article_id, title, source, url, summary, key_points, processed, scraped_date = article
+    # Article metadata
+    col1, col2, col3 = st.columns([2, 1, 1])
+    
+    with col1:
+        st.markdown(f"**Source:** {source}")
+        st.markdown(f"**Scraped:** {scraped_date}")
+    
+    with col2:
+        st.markdown(f"[🔗 Read Original]({url})")
+    
+    with col3:
+        if not processed and ANTHROPIC_AVAILABLE and AI_SERVICE_AVAILABLE:
+            if st.button("🤖 Analyze Now", key=f"analyze_{article_id}"):
+                queue_reanalysis(db, [article_id])
+        elif processed and AI_SERVICE_AVAILABLE:
+            if st.button("🔄 Re-analyze", key=f"reanalyze_{article_id}"):
+                queue_reanalysis(db, [article_id])
+    
+    # Show analysis if available
+    if processed and summary:
+        st.markdown("---")
         
-        # Create expandable article card
-        status_icon = "✅" if processed else "❌"
-        processed_text = "Analyzed" if processed else "Not Analyzed"
+        # Executive Summary
+        st.markdown("### 📋 Executive Summary")
+        st.markdown(summary)
         
-        with st.expander(f"{status_icon} {title} ({source}) - {processed_text}"):
-            # Article metadata
-            col1, col2, col3 = st.columns([2, 1, 1])
-            
-            with col1:
-                st.markdown(f"**Source:** {source}")
-                st.markdown(f"**Scraped:** {scraped_date}")
-            
-            with col2:
-                st.markdown(f"[🔗 Read Original]({url})")
+        # Detailed Analysis
+        if key_points:
+            st.markdown("### 🔍 Detailed Analysis")
             
-            with col3:
-                if not processed and ANTHROPIC_AVAILABLE:
-                    if st.button("🤖 Analyze Now", key=f"analyze_{article_id}"):
-                        with st.spinner("Analyzing article..."):
-                            success, message = db.reprocess_single_article(article_id)
-                            if success:
-                                st.success("Article analyzed successfully!")
-                                st.rerun()
-                            else:
-                                st.error(f"Analysis failed: {message}")
-                elif processed:
-                    if st.button("🔄 Re-analyze", key=f"reanalyze_{article_id}"):
-                        with st.spinner("Re-analyzing article..."):
-                            success, message = db.reprocess_single_article(article_id)
-                            if success:
-                                st.success("Article re-analyzed successfully!")
-                                st.rerun()
-                            else:
-                                st.error(f"Re-analysis failed: {message}")
-            
-            # Show analysis if available
-            if processed and summary:
-                st.markdown("---")
-                
-                # Executive Summary
-                st.markdown("### 📋 Executive Summary")
-                st.markdown(summary)
-                
-                # Detailed Analysis
-                if key_points:
-                    st.markdown("### 🔍 Detailed Analysis")
-                    
-                    # Parse and display the structured key points
-                    sections = key_points.split('\n\n')
-                    
-                    for section in sections:
-                        if section.strip():
-                            lines = section.strip().split('\n')
-                            if lines:
-                                # Check if this is a section header
-                                if lines[0].startswith('🎯') or lines[0].startswith('🔧') or lines[0].startswith('✅') or lines[0].startswith('🚨') or lines[0].startswith('🛠️') or lines[0].startswith('📊'):
-                                    st.markdown(f"**{lines[0]}**")
-                                    
-                                    # Display the content of this section
-                                    for line in lines[1:]:
-                                        if line.strip():
-                                            if line.startswith('•'):
-                                                st.markdown(f"  {line}")
-                                            else:
-                                                st.markdown(line)
-                                else:
-                                    # Regular content
-                                    for line in lines:
-                                        if line.strip():
-                                            st.markdown(line)
-                            
-                            st.markdown("")  # Add spacing between sections
-            
-            elif not processed:
-                st.info("🤖 This article hasn't been analyzed yet. Click 'Analyze Now' to get comprehensive cybersecurity insights.")
-            
-            else:
-                st.warning("⚠️ Analysis data appears to be incomplete. Try re-analyzing this article.")
+            # Parse and display the structured key points
+            st.markdown(format_key_points(key_points))
+    
+    elif not processed:
+        st.info("🤖 This article hasn't been analyzed yet. Click 'Analyze Now' to get comprehensive cybersecurity insights.")
+    
+    else:
+        st.warning("⚠️ Analysis data appears to be incomplete. Try re-analyzing this article.")
 
+@st.fragment
 def show_sources(db):
     """Manage blog sources"""
+    # A fragment, like show_articles: adding or editing sources reruns only this page
     st.header("📚 Blog Sources")
     
     # Add new source
@@ -1142,61 +1719,60 @@ def show_sources(db):
                         (name, url, rss_url if rss_url else None, scrape_type)
                     )
                     st.success(f"Added source: {name}")
-                    st.rerun()
+                    # Only the source lists and article views; keep the memoized connection tests
+                    clear_article_caches()
+                    get_article_sources.clear()
+                    st.rerun(scope="fragment")
                 else:
                     st.error("Please provide both name and URL")
     
     # Display existing sources
     st.subheader("Current Sources")
-    sources = db.execute_query(
-        "SELECT id, name, url, scrape_type, active, last_scraped FROM blog_sources ORDER BY name",
-        fetch=True
-    )
+    sources = get_blog_sources(db)
     
-    for source in sources:
-        source_id, name, url, scrape_type, active, last_scraped = source
+    # Edits are collected in the table and applied together, so N toggles cost one transaction and one rerun
+    rows = [
+        {"ID": source_id, "Active": bool(active), "Name": name, "URL": url, "Type": scrape_type,
+         "Last Scraped": last_scraped or "Never", "Delete": False}
+        for source_id, name, url, scrape_type, active, last_scraped in sources
+    ]
+    with st.form("source_changes"):
+        edited = st.data_editor(
+            rows,
+            column_config={
+                "ID": None,
+                "URL": st.column_config.LinkColumn("URL"),
+                "Active": st.column_config.CheckboxColumn("Active"),
+                "Delete": st.column_config.CheckboxColumn("Delete"),
+            },
+            disabled=["Name", "URL", "Type", "Last Scraped"],
+            hide_index=True,
+            use_container_width=True,
+        )
         
-        with st.container():
-            col1, col2, col3, col4 = st.columns([3, 2, 1, 1])
-            
-            with col1:
-                status_icon = "✅" if active else "❌"
-                st.markdown(f"{status_icon} **{name}**")
-                st.markdown(f"[{url}]({url})")
-            
-            with col2:
-                st.markdown(f"**Type:** {scrape_type}")
-                st.markdown(f"**Last Scraped:** {last_scraped or 'Never'}")
-            
-            with col3:
-                if st.button("Toggle", key=f"toggle_{source_id}"):
-                    db.execute_query(
-                        "UPDATE blog_sources SET active = ? WHERE id = ?",
-                        (1 - active, source_id)
-                    )
-                    st.rerun()
-            
-            with col4:
-                if st.button("Delete", key=f"delete_{source_id}"):
-                    db.execute_query("DELETE FROM blog_sources WHERE id = ?", (source_id,))
-                    st.rerun()
-            
-            st.divider()
+        if st.form_submit_button("Apply Changes"):
+            deletes = [(row["ID"],) for row in edited if row["Delete"]]
+            activity = [
+                (int(row["Active"]), row["ID"]) for row, original in zip(edited, rows)
+                if not row["Delete"] and row["Active"] != original["Active"]
+            ]
+            if deletes or activity:
+                if db.apply_source_changes(activity, deletes):
+                    # Only the source lists and article views; keep the memoized connection tests
+                    clear_article_caches()
+                    get_article_sources.clear()
+                    st.rerun(scope="fragment")
+                else:
+                    st.error("Failed to apply source changes")
+            else:
+                st.info("No changes to apply")
 
 def show_settings(db):
     """Manage notification settings"""
     st.header("⚙️ Settings")
     
     # Get current settings
-    settings = db.execute_query(
-        "SELECT email_enabled, email_address, whatsapp_enabled, whatsapp_number FROM notification_settings LIMIT 1",
-        fetch=True
-    )
-    
-    if settings:
-        email_enabled, email_address, whatsapp_enabled, whatsapp_number = settings[0]
-    else:
-        email_enabled, email_address, whatsapp_enabled, whatsapp_number = 1, "", 1, ""
+    email_enabled, email_address, whatsapp_enabled, whatsapp_number = get_notification_settings(db)
     
     # Email settings
     st.subheader("📧 Email Notifications")
@@ -1205,17 +1781,14 @@ def show_settings(db):
         new_email_address = st.text_input("Email Address", value=email_address or "")
         
         if st.form_submit_button("Save Email Settings"):
-            # Update or insert settings
-            if settings:
-                db.execute_query(
-                    "UPDATE notification_settings SET email_enabled = ?, email_address = ?",
-                    (int(new_email_enabled), new_email_address)
-                )
-            else:
-                db.execute_query(
-                    "INSERT INTO notification_settings (email_enabled, email_address, whatsapp_enabled, whatsapp_number) VALUES (?, ?, 1, '')",
-                    (int(new_email_enabled), new_email_address)
-                )
+            # Settings live in a single row (id 1), created by the first save
+            db.execute_query(
+                """INSERT INTO notification_settings (id, email_enabled, email_address) VALUES (1, ?, ?)
+                   ON CONFLICT(id) DO UPDATE SET email_enabled = excluded.email_enabled,
+                       email_address = excluded.email_address, last_updated = CURRENT_TIMESTAMP""",
+                (int(new_email_enabled), new_email_address)
+            )
+            get_notification_settings.clear()
             st.success("Email settings saved!")
             st.rerun()
     
@@ -1226,16 +1799,13 @@ def show_settings(db):
         new_whatsapp_number = st.text_input("WhatsApp Number (with country code)", value=whatsapp_number or "")
         
         if st.form_submit_button("Save WhatsApp Settings"):
-            if settings:
-                db.execute_query(
-                    "UPDATE notification_settings SET whatsapp_enabled = ?, whatsapp_number = ?",
-                    (int(new_whatsapp_enabled), new_whatsapp_number)
-                )
-            else:
-                db.execute_query(
-                    "INSERT INTO notification_settings (email_enabled, email_address, whatsapp_enabled, whatsapp_number) VALUES (1, '', ?, ?)",
-                    (int(new_whatsapp_enabled), new_whatsapp_number)
-                )
+            db.execute_query(
+                """INSERT INTO notification_settings (id, whatsapp_enabled, whatsapp_number) VALUES (1, ?, ?)
+                   ON CONFLICT(id) DO UPDATE SET whatsapp_enabled = excluded.whatsapp_enabled,
+                       whatsapp_number = excluded.whatsapp_number, last_updated = CURRENT_TIMESTAMP""",
+                (int(new_whatsapp_enabled), new_whatsapp_number)
+            )
+            get_notification_settings.clear()
             st.success("WhatsApp settings saved!")
             st.rerun()
     